@@ -0,0 +1,61 @@
+"""Compare loading manifest.json, catalog.json and dbt_project.yml one after another and concurrently.
+
+The gain depends on storage latency, so run it against a project on the storage you use:
+
+    python benchmarks/artifact_loading.py --models 2000 --columns 50
+    python benchmarks/artifact_loading.py --project-dir /mnt/shared/analytics
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from dbt2looker import cli, loader, synthetic
+
+
+def load_sequentially(target_dir: str, project_dir: str, json_decoder: str):
+    return (
+        cli.get_manifest(prefix=target_dir, json_decoder=json_decoder),
+        cli.get_catalog(prefix=target_dir, json_decoder=json_decoder),
+        cli.get_dbt_project_config(prefix=project_dir),
+    )
+
+
+def load_concurrently(target_dir: str, project_dir: str, json_decoder: str):
+    return cli.load_artifacts(target_dir, project_dir, json_decoder=json_decoder)
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    synthetic.add_arguments(argparser)
+    argparser.add_argument('--project-dir', type=str, help='Benchmark an existing dbt project instead of a synthetic one')
+    argparser.add_argument('--target-dir', type=str, help='Target directory of --project-dir. Default is PROJECT_DIR/target')
+    argparser.add_argument('--json-decoder', default='auto', choices=['auto', *loader.JSON_DECODERS])
+    argparser.add_argument('--repeat', default=5, type=int)
+    args = argparser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.project_dir:
+            project_dir = args.project_dir
+            target_dir = args.target_dir or os.path.join(project_dir, 'target')
+        else:
+            project_dir = tmp_dir
+            target_dir = synthetic.write_project(project_dir, **synthetic.generator_kwargs(args))
+        loaders = (('sequential', load_sequentially), ('concurrent', load_concurrently))
+        seconds = {name: [] for name, _ in loaders}
+        reference = load_sequentially(target_dir, project_dir, args.json_decoder)
+        for index in range(args.repeat):
+            # Alternate the order so neither way always runs with the other's garbage still around
+            for name, load in loaders[::-1] if index % 2 else loaders:
+                start = time.perf_counter()
+                artifacts = load(target_dir, project_dir, args.json_decoder)
+                seconds[name].append(time.perf_counter() - start)
+                if artifacts != reference:
+                    raise AssertionError(f'{name} loading produced different artifacts')
+                del artifacts
+        for name, _ in loaders:
+            print(f'{name:<11} best {min(seconds[name]):7.3f}s  mean {sum(seconds[name]) / len(seconds[name]):7.3f}s')
+
+
+if __name__ == '__main__':
+    main()
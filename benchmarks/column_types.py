@@ -0,0 +1,53 @@
+"""Compare loading typed models with catalog column types and with declared column types.
+
+Times loading, validating and type joining the artifacts with column_types="catalog" and
+column_types="manifest", and checks that both yield the same lookml. The typed models may
+differ, declared types drop their precision while catalog types keep it, e.g. decimal(18,2).
+With every column declared the catalog is never read. Run from the repository root:
+
+    python benchmarks/column_types.py --models 2000 --columns 50 --declared-types 1
+    python benchmarks/column_types.py --models 2000 --columns 50 --declared-types 0.9
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from dbt2looker import api, loader, synthetic
+
+
+def load_project(target_dir: str, column_types: str) -> api.DbtProject:
+    def read_catalog():
+        with open(os.path.join(target_dir, 'catalog.json'), 'rb') as f:
+            return loader.load_json(f)
+
+    with open(os.path.join(target_dir, 'manifest.json'), 'rb') as manifest:
+        project = api.load_dbt_project(manifest, read_catalog, {'name': synthetic.PROJECT_NAME}, column_types=column_types)
+    return project
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    synthetic.add_arguments(argparser)
+    argparser.add_argument('--repeat', default=3, type=int)
+    args = argparser.parse_args()
+
+    with tempfile.TemporaryDirectory() as project_dir:
+        target_dir = synthetic.write_project(project_dir, **synthetic.generator_kwargs(args))
+        reference = None
+        for column_types in ('catalog', 'manifest'):
+            seconds = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                project = load_project(target_dir, column_types)
+                seconds.append(time.perf_counter() - start)
+            lookml_files = dict(api.generate_lookml_files(project))
+            if reference is None:
+                reference = lookml_files
+            elif lookml_files != reference:
+                raise AssertionError(f'column_types={column_types} yields different lookml')
+            print(f'{column_types:<9} best {min(seconds):7.3f}s  mean {sum(seconds) / len(seconds):7.3f}s  {len(project.models)} models')
+
+
+if __name__ == '__main__':
+    main()
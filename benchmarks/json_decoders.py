@@ -0,0 +1,50 @@
+"""Compare the installed JSON decoders on manifest.json and catalog.json.
+
+Times decoding plus validation with each decoder in dbt2looker.loader.JSON_DECODERS and
+checks that every decoder yields the same typed models. Run from the repository root:
+
+    python benchmarks/json_decoders.py --models 2000 --columns 50
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from dbt2looker import loader, parser, synthetic
+
+
+def decode_and_parse(target_dir: str, decoder: str):
+    with open(os.path.join(target_dir, 'manifest.json'), 'rb') as f:
+        raw_manifest = loader.load_json(f, decoder=decoder)
+    with open(os.path.join(target_dir, 'catalog.json'), 'rb') as f:
+        raw_catalog = loader.load_json(f, decoder=decoder)
+    decoded = time.perf_counter()
+    project = parser.parse_project(raw_manifest, raw_catalog, {'name': synthetic.PROJECT_NAME})
+    return decoded, parser.parse_typed_models(project)
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    synthetic.add_arguments(argparser)
+    argparser.add_argument('--repeat', default=3, type=int)
+    args = argparser.parse_args()
+
+    with tempfile.TemporaryDirectory() as project_dir:
+        target_dir = synthetic.write_project(project_dir, **synthetic.generator_kwargs(args))
+        reference = None
+        for decoder in loader.JSON_DECODERS:
+            decode_seconds, total_seconds = [], []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                decoded, typed_models = decode_and_parse(target_dir, decoder)
+                decode_seconds.append(decoded - start)
+                total_seconds.append(time.perf_counter() - start)
+            if reference is None:
+                reference = typed_models
+            elif typed_models != reference:
+                raise AssertionError(f'{decoder} produced different typed models than json')
+            print(f'{decoder:<8} decode {min(decode_seconds):7.3f}s  decode + validate {min(total_seconds):7.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark artifact validation for a single dbt2looker run.
+
+Runs dbt2looker through its command line entry point, counts how often the manifest and
+catalog nodes are validated and reports the time spent. Each selected model's catalog node
+should be validated exactly once. Arguments that are not listed below are passed on to
+dbt2looker. Run from the repository root:
+
+    python benchmarks/parse_once.py --models 2000 --columns 50
+    python benchmarks/parse_once.py --project-dir path/to/dbt --tag finance --select +orders
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from dbt2looker import cli, models, synthetic
+
+COUNTED_MODELS = (models.DbtManifest, models.DbtModel, models.DbtCatalogNode)
+
+
+def count_validations(counter: Counter, model_class):
+    original_init = model_class.__init__
+
+    def counting_init(self, **data):
+        original_init(self, **data)
+        # Only successful validations count, union fields also try DbtModel on nodes that are not models
+        counter[model_class.__name__] += 1
+
+    model_class.__init__ = counting_init
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    synthetic.add_arguments(argparser)
+    argparser.add_argument('--project-dir', type=str, help='Run against an existing dbt project instead of a synthetic one')
+    argparser.add_argument('--target-dir', type=str, help='Target directory of --project-dir. Default is PROJECT_DIR/target')
+    args, dbt2looker_args = argparser.parse_known_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.project_dir:
+            project_dir = args.project_dir
+            target_dir = args.target_dir or os.path.join(project_dir, 'target')
+        else:
+            project_dir = os.path.join(tmp_dir, 'project')
+            target_dir = synthetic.write_project(project_dir, **synthetic.generator_kwargs(args))
+
+        validations = Counter()
+        for model_class in COUNTED_MODELS:
+            count_validations(validations, model_class)
+
+        sys.argv = [
+            'dbt2looker',
+            '--project-dir', project_dir,
+            '--target-dir', target_dir,
+            '--output-dir', os.path.join(tmp_dir, 'lookml'),
+            '--log-level', 'WARN',
+            *dbt2looker_args,
+        ]
+        start = time.perf_counter()
+        cli.run()
+        elapsed = time.perf_counter() - start
+
+    print(f'Ran dbt2looker in {elapsed:.3f}s')
+    for model_class in COUNTED_MODELS:
+        print(f'{model_class.__name__} validated {validations[model_class.__name__]} time(s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Time and memory-profile each dbt2looker stage on a synthetic or existing dbt project.
+
+Results are written as JSON so runs can be compared across commits:
+
+    python benchmarks/run.py --models 2000 --columns 50 --output before.json
+    git checkout my-branch
+    python benchmarks/run.py --models 2000 --columns 50 --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from dbt2looker import cli, generator, loader, parser, synthetic
+
+
+def load_artifacts(state: dict):
+    state['raw_manifest'], state['raw_catalog'], state['raw_config'] = cli.load_artifacts(
+        state['target_dir'], state['project_dir'], json_decoder=state['json_decoder'],
+    )
+
+
+def parse_project(state: dict):
+    state['project'] = parser.parse_project(state['raw_manifest'], state['raw_catalog'], state['raw_config'])
+
+
+def parse_typed_models(state: dict):
+    state['typed_models'] = parser.parse_typed_models(state['project'])
+    state['adapter_type'] = parser.parse_adapter_type(state['project'].manifest)
+
+
+def generate_views(state: dict):
+    state['views'] = generator.lookml_views_from_dbt_models(
+        state['typed_models'], state['adapter_type'], jobs=state['jobs'], emitter=state['emitter'],
+    )
+
+
+def generate_models(state: dict):
+    state['models'] = generator.lookml_models_from_dbt_models(
+        state['typed_models'], state['project'].config.name, jobs=state['jobs'], emitter=state['emitter'],
+    )
+
+
+def write_files(state: dict):
+    with tempfile.TemporaryDirectory() as output_dir:
+        os.makedirs(os.path.join(output_dir, 'views'))
+        for view in state['views']:
+            with open(os.path.join(output_dir, 'views', view.filename), 'w') as f:
+                f.write(view.contents)
+        for model in state['models']:
+            with open(os.path.join(output_dir, model.filename), 'w') as f:
+                f.write(model.contents)
+
+
+STAGES: List[Tuple[str, Callable[[dict], None]]] = [
+    ('load_json', load_artifacts),
+    ('parse_project', parse_project),
+    ('parse_typed_models', parse_typed_models),
+    ('generate_views', generate_views),
+    ('generate_models', generate_models),
+    ('write_files', write_files),
+]
+
+
+def run_stages(state: dict, trace_memory: bool) -> Dict[str, dict]:
+    results = {}
+    for name, stage in STAGES:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        stage(state)
+        seconds = time.perf_counter() - start
+        results[name] = {'seconds': seconds}
+        if trace_memory:
+            results[name]['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return results
+
+
+def benchmark(state: dict, repeat: int) -> Dict[str, dict]:
+    # Timings are the best of `repeat` untraced runs, memory comes from one extra traced run
+    timings = [run_stages(dict(state), trace_memory=False) for _ in range(repeat)]
+    memory = run_stages(dict(state), trace_memory=True)
+    return {
+        name: {
+            'seconds': min(run[name]['seconds'] for run in timings),
+            'peak_bytes': memory[name]['peak_bytes'],
+        }
+        for name, _ in STAGES
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    regressed = False
+    print(f'\nCompared with {baseline["revision"]}:')
+    for name, stage in results['stages'].items():
+        previous = baseline['stages'].get(name)
+        if previous is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            ratio = stage[metric] / previous[metric] if previous[metric] else 1.0
+            flag = ''
+            if ratio > 1 + threshold:
+                flag = '  REGRESSION'
+                regressed = True
+            print(f'  {name:<20} {metric:<10} {ratio:6.2f}x{flag}')
+    return regressed
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    synthetic.add_arguments(argparser)
+    argparser.add_argument('--project-dir', type=str, help='Benchmark an existing dbt project instead of a synthetic one')
+    argparser.add_argument('--target-dir', type=str, help='Target directory of --project-dir. Default is PROJECT_DIR/target')
+    argparser.add_argument('--jobs', default=1, type=int)
+    argparser.add_argument('--emitter', default='lkml', choices=list(generator.LOOKML_EMITTERS))
+    argparser.add_argument('--json-decoder', default='auto', choices=['auto', *loader.JSON_DECODERS])
+    argparser.add_argument('--repeat', default=3, type=int)
+    argparser.add_argument('--output', type=str, help='Write results as JSON to this path')
+    argparser.add_argument('--compare', type=str, help='Compare with results JSON from a previous run')
+    argparser.add_argument('--threshold', default=0.2, type=float, help='Relative slowdown reported as a regression')
+    args = argparser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.project_dir:
+            project_dir = args.project_dir
+            target_dir = args.target_dir or os.path.join(project_dir, 'target')
+            params = {'project_dir': project_dir}
+        else:
+            project_dir = tmp_dir
+            target_dir = synthetic.write_project(project_dir, **synthetic.generator_kwargs(args))
+            params = synthetic.generator_kwargs(args)
+        params.update({'jobs': args.jobs, 'emitter': args.emitter, 'json_decoder': args.json_decoder, 'repeat': args.repeat})
+        state = {
+            'project_dir': project_dir,
+            'target_dir': target_dir,
+            'jobs': args.jobs,
+            'emitter': args.emitter,
+            'json_decoder': args.json_decoder,
+        }
+        stages = benchmark(state, args.repeat)
+
+    results = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'params': params,
+        'stages': stages,
+    }
+    for name, stage in stages.items():
+        print(f'{name:<20} {stage["seconds"]:9.3f}s {stage["peak_bytes"] / 2**20:9.1f} MiB')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('params') != params:
+            print('Warning: baseline was run with different parameters')
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
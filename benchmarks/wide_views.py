@@ -0,0 +1,75 @@
+"""Compare peak memory and time of writing very wide views in memory, streamed and split.
+
+Measures traced memory while the views of already validated models are generated and written,
+and checks that streamed views match the in-memory ones. Run from the repository root:
+
+    python benchmarks/wide_views.py --models 5 --columns 1500 --measures 2 --view-max-fields 500
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from dbt2looker import api, generator, synthetic, writer
+
+
+def write_in_memory(output_dir: str, project: api.DbtProject, emitter: str):
+    for model in project.models:
+        view = generator.lookml_view_from_dbt_model(model, project.adapter_type, emitter=emitter)
+        with open(os.path.join(output_dir, 'views', view.filename), 'w') as f:
+            f.write(view.contents)
+
+
+def write_streamed(output_dir: str, project: api.DbtProject, max_fields=None):
+    for model in project.models:
+        writer.stream_view_files(output_dir, model, project.adapter_type, max_fields=max_fields)
+
+
+def read_views(output_dir: str) -> dict:
+    views_dir = os.path.join(output_dir, 'views')
+    views = {}
+    for filename in sorted(os.listdir(views_dir)):
+        with open(os.path.join(views_dir, filename)) as f:
+            views[filename] = f.read()
+    return views
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    synthetic.add_arguments(argparser)
+    argparser.add_argument('--view-max-fields', default=500, type=int)
+    args = argparser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        project_dir = os.path.join(tmp_dir, 'project')
+        target_dir = synthetic.write_project(project_dir, **synthetic.generator_kwargs(args))
+        with open(os.path.join(target_dir, 'manifest.json'), 'rb') as manifest, open(os.path.join(target_dir, 'catalog.json'), 'rb') as catalog:
+            project = api.load_dbt_project(manifest, catalog, {'name': synthetic.PROJECT_NAME})
+
+        writers = {
+            'lkml': lambda output_dir: write_in_memory(output_dir, project, 'lkml'),
+            'native': lambda output_dir: write_in_memory(output_dir, project, 'native'),
+            'streamed': lambda output_dir: write_streamed(output_dir, project),
+            f'split {args.view_max_fields}': lambda output_dir: write_streamed(output_dir, project, max_fields=args.view_max_fields),
+        }
+        reference = None
+        for name, write in writers.items():
+            output_dir = os.path.join(tmp_dir, name.replace(' ', '_'))
+            os.makedirs(os.path.join(output_dir, 'views'))
+            tracemalloc.start()
+            start = time.perf_counter()
+            write(output_dir)
+            seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            views = read_views(output_dir)
+            if reference is None:
+                reference = views
+            elif not name.startswith('split') and views != reference:
+                raise AssertionError(f'{name} wrote different views')
+            print(f'{name:<12} {seconds:7.3f}s  peak {peak / 2 ** 20:8.1f} MiB  {len(views)} files')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+from .api import DbtProject, generate_lookml, generate_lookml_files, load_dbt_project
@@ -0,0 +1,171 @@
+import logging
+from typing import IO, Callable, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from . import generator
+from . import loader
+from . import models
+from . import parser
+from . import profiling
+from . import selector
+
+ArtifactSource = Union[dict, IO]
+# The catalog can also be a function loading it, called only when column types are needed from it
+CatalogSource = Union[ArtifactSource, Callable[[], Optional[dict]]]
+
+
+class DbtProject(NamedTuple):
+    models: List[models.DbtTypedModel]
+    adapter_type: models.SupportedDbtAdapters
+    name: str
+    # Unique ids of every model in the manifest, also those that were not selected
+    model_ids: FrozenSet[str]
+
+
+def read_json_artifact(source: ArtifactSource, json_decoder: str = 'auto') -> dict:
+    if isinstance(source, dict):
+        return source
+    return loader.load_json(source, decoder=json_decoder)
+
+
+def read_catalog(source: Optional[CatalogSource], json_decoder: str = 'auto') -> Optional[dict]:
+    if callable(source):
+        return source()
+    return None if source is None else read_json_artifact(source, json_decoder=json_decoder)
+
+
+def read_project_config(source: ArtifactSource) -> dict:
+    if isinstance(source, dict):
+        return source
+    return loader.load_yaml(source)
+
+
+def load_dbt_project(
+    manifest: ArtifactSource,
+    catalog: Optional[CatalogSource],
+    project_config: ArtifactSource,
+    tag: Optional[str] = None,
+    select: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    json_decoder: str = 'auto',
+    profiler: Optional[profiling.RunProfiler] = None,
+    column_types: str = 'catalog',
+) -> DbtProject:
+    """Validate dbt artifacts and join catalog types onto the selected dbt models.
+
+    manifest and catalog are loaded dicts or open json files, project_config is a loaded
+    dict or an open dbt_project.yml. Raises selector.SelectorError for invalid selectors,
+    parser.EmptyModelError for models with empty files and pydantic.ValidationError for
+    invalid artifacts.
+
+    With column_types="manifest" column types come from the data_type declared on model
+    columns and models missing from the catalog are kept. The catalog, which may then be
+    None or a function returning it, is only read when a selected column has no declared
+    data_type.
+    """
+    if column_types not in parser.COLUMN_TYPE_SOURCES:
+        raise ValueError(f'Unknown column_types "{column_types}", use one of: {", ".join(parser.COLUMN_TYPE_SOURCES)}')
+    if catalog is None and column_types == 'catalog':
+        raise ValueError('A catalog is required unless column_types="manifest"')
+    profiler = profiler or profiling.RunProfiler()
+    raw_manifest = read_json_artifact(manifest, json_decoder=json_decoder)
+    raw_catalog = read_catalog(catalog, json_decoder=json_decoder) if column_types == 'catalog' else None
+    raw_config = read_project_config(project_config)
+    model_ids = frozenset(
+        unique_id
+        for unique_id, raw_node in raw_manifest.get('nodes', {}).items()
+        if raw_node.get('resource_type') == 'model'
+    )
+
+    # Select models before validating so unselected models cost nothing
+    if select or exclude:
+        with profiler.stage('select'):
+            raw_manifest, raw_catalog = selector.select_artifacts(raw_manifest, raw_catalog, select=select, exclude=exclude)
+
+    # Validate artifacts once and get dbt models from manifest
+    with profiler.stage('parse'):
+        project = parser.parse_project(raw_manifest, raw_catalog, raw_config)
+
+    if column_types == 'manifest':
+        undeclared = parser.undeclared_column_count(parser.parse_models(project.manifest, tag=tag))
+        if not undeclared:
+            logging.debug('Every selected column declares a data_type, catalog.json is not needed')
+        elif catalog is not None:
+            logging.debug('%d selected columns have no declared data_type, reading their types from catalog.json', undeclared)
+            with profiler.stage('load_catalog'):
+                raw_catalog = read_catalog(catalog, json_decoder=json_decoder)
+            if raw_catalog is not None:
+                project = project.copy(update={'catalog': parser.parse_catalog(raw_catalog)})
+
+    with profiler.stage('type_join'):
+        typed_dbt_models = parser.parse_typed_models(project, tag=tag, column_types=column_types)
+    return DbtProject(
+        models=typed_dbt_models,
+        adapter_type=parser.parse_adapter_type(project.manifest),
+        name=project.config.name,
+        model_ids=model_ids,
+    )
+
+
+def generate_lookml_files(
+    project: DbtProject,
+    connection_name: Optional[str] = None,
+    jobs: int = 1,
+    emitter: str = 'lkml',
+    model_seconds: Optional[Dict[str, float]] = None,
+    model_files: str = 'model',
+    view_max_fields: Optional[int] = None,
+    stage_seconds: Optional[Dict[str, float]] = None,
+) -> Iterator[Tuple[str, str]]:
+    """Lazily generate (filename, contents) pairs for the views and models of a loaded project.
+
+    View filenames are prefixed with "views/". connection_name defaults to the dbt project name.
+    model_files is "model" for one model file per dbt model, or "project", "folder", "tag" or
+    "package" for consolidated model files. Views with more than view_max_fields fields are
+    split into a base view and +refinement files. The seconds spent generating views and models
+    are added to stage_seconds under "generate_views" and "generate_models".
+    """
+    return generator.iter_lookml_files(
+        project.models,
+        project.adapter_type,
+        connection_name or project.name,
+        jobs=jobs,
+        emitter=emitter,
+        model_seconds=model_seconds,
+        model_files=model_files,
+        project_name=project.name,
+        view_max_fields=view_max_fields,
+        stage_seconds=stage_seconds,
+    )
+
+
+def generate_lookml(
+    manifest: ArtifactSource,
+    catalog: Optional[CatalogSource],
+    project_config: ArtifactSource,
+    tag: Optional[str] = None,
+    select: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    connection_name: Optional[str] = None,
+    jobs: int = 1,
+    emitter: str = 'lkml',
+    json_decoder: str = 'auto',
+    model_files: str = 'model',
+    view_max_fields: Optional[int] = None,
+    column_types: str = 'catalog',
+) -> Iterator[Tuple[str, str]]:
+    """Generate lookml for dbt artifacts without touching the filesystem.
+
+    The artifacts are validated when this is called, lookml is generated lazily while the
+    returned iterator of (filename, contents) pairs is consumed.
+    """
+    project = load_dbt_project(
+        manifest,
+        catalog,
+        project_config,
+        tag=tag,
+        select=select,
+        exclude=exclude,
+        json_decoder=json_decoder,
+        column_types=column_types,
+    )
+    return generate_lookml_files(project, connection_name=connection_name, jobs=jobs, emitter=emitter, model_files=model_files, view_max_fields=view_max_fields)
@@ -0,0 +1,82 @@
+import functools
+import logging
+import time
+from typing import IO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from . import api
+from . import generator
+from . import loader
+from . import models
+from . import parser
+
+TARGET_KEYS = ('tag', 'output_dir', 'model_connection')
+
+
+class BatchTarget(NamedTuple):
+    output_dir: str
+    tag: Optional[str] = None
+    model_connection: Optional[str] = None
+
+
+def batch_target(values: Dict[str, str]) -> BatchTarget:
+    values = loader.check_settings(values, TARGET_KEYS, 'target')
+    if not values.get('output_dir'):
+        raise ValueError('Every target needs an output-dir')
+    return BatchTarget(**values)
+
+
+def parse_target(spec: str) -> BatchTarget:
+    # e.g. "tag=finance,output-dir=lookml/finance,model-connection=warehouse"
+    return batch_target(loader.parse_settings(spec, 'target'))
+
+
+def load_targets_file(f: IO) -> List[BatchTarget]:
+    config = loader.load_yaml(f) or {}
+    targets = config.get('targets') if isinstance(config, dict) else None
+    if not isinstance(targets, list):
+        raise ValueError('Targets file needs a "targets" list')
+    return [batch_target({key: str(value) for key, value in target.items()}) for target in targets]
+
+
+def iter_batch_files(
+    project: api.DbtProject,
+    targets: List[BatchTarget],
+    jobs: int = 1,
+    emitter: str = 'lkml',
+    model_files: str = 'model',
+    view_max_fields: Optional[int] = None,
+    stage_seconds: Optional[Dict[str, float]] = None,
+) -> Iterator[Tuple[int, str, str]]:
+    # Yields (index of the target, filename, contents). Each view is generated once and written to every
+    # target that selects its model, model files are shared between targets with the same connection.
+    target_models = [parser.filter_typed_models(project.models, target.tag) for target in targets]
+    target_ids = [{model.unique_id for model in dbt_models} for dbt_models in target_models]
+    selected = [model for model in project.models if any(model.unique_id in ids for ids in target_ids)]
+    logging.debug('Generating %d views for %d targets', len(selected), len(targets))
+
+    func = functools.partial(generator.lookml_view_files_from_dbt_model, adapter_type=project.adapter_type, emitter=emitter, max_fields=view_max_fields)
+    refined_views = set()
+    for model, views in zip(selected, generator.iter_timed(generator.imap_models(func, selected, jobs=jobs), 'generate_views', stage_seconds)):
+        if len(views) > 1:
+            refined_views.add(model.name)
+        for index, ids in enumerate(target_ids):
+            if model.unique_id in ids:
+                for view in views:
+                    yield index, f'views/{view.filename}', view.contents
+
+    model_file_cache: Dict[Tuple[str, str], models.LookModelFile] = {}
+    for index, (target, dbt_models) in enumerate(zip(targets, target_models)):
+        connection_name = target.model_connection or project.name
+        if model_files != 'model':
+            grouped_models = generator.lookml_grouped_models_from_dbt_models(dbt_models, connection_name, model_files, project.name, emitter=emitter, refined_views=refined_views)
+            for model_file in generator.iter_timed(grouped_models, 'generate_models', stage_seconds):
+                yield index, model_file.filename, model_file.contents
+            continue
+        for model in dbt_models:
+            key = (model.unique_id, connection_name)
+            if key not in model_file_cache:
+                start = time.perf_counter()
+                model_file_cache[key] = generator.lookml_model_from_dbt_model(model, connection_name, emitter=emitter)
+                if stage_seconds is not None:
+                    stage_seconds['generate_models'] = stage_seconds.get('generate_models', 0.0) + time.perf_counter() - start
+            yield index, model_file_cache[key].filename, model_file_cache[key].contents
@@ -0,0 +1,114 @@
+import contextlib
+import gc
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+import tempfile
+from typing import List, Optional
+try:
+    from importlib.metadata import version
+except ImportError:
+    from importlib_metadata import version
+
+from . import api
+
+CACHE_SUFFIX = '.pickle'
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join('~', '.cache'), 'dbt2looker')
+
+
+@contextlib.contextmanager
+def gc_paused():
+    # Unpickling creates hundreds of thousands of objects, letting the collector run meanwhile triples the load time
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def project_key(paths: List[str], select: Optional[List[str]] = None, exclude: Optional[List[str]] = None, column_types: str = 'catalog') -> Optional[str]:
+    # dbt rewrites its artifacts on every invocation, so path, size, inode and mtime identify their contents
+    artifacts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        artifacts.append([os.path.realpath(path), stat.st_size, stat.st_ino, stat.st_mtime_ns])
+    inputs = json.dumps({
+        'version': version('dbt2looker'),
+        'python': list(sys.version_info[:2]),
+        'artifacts': artifacts,
+        'select': select,
+        'exclude': exclude,
+        'column_types': column_types,
+    }, sort_keys=True)
+    return hashlib.sha256(inputs.encode('utf-8')).hexdigest()
+
+
+def load_project(cache_dir: str, key: str) -> Optional[api.DbtProject]:
+    path = os.path.join(os.path.expanduser(cache_dir), key + CACHE_SUFFIX)
+    try:
+        with open(path, 'rb') as f, gc_paused():
+            project = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f'Ignoring unreadable cache entry at {path}: {e}')
+        remove_entry(path)
+        return None
+    if not isinstance(project, api.DbtProject):
+        remove_entry(path)
+        return None
+    # Mark the entry as recently used for eviction
+    os.utime(path)
+    logging.debug(f'Loaded {len(project.models)} typed models from cache entry {path}')
+    return project
+
+
+def save_project(cache_dir: str, key: str, project: api.DbtProject, max_bytes: int):
+    cache_dir = os.path.expanduser(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write to a temporary file and rename it, so concurrent runs never read a partial entry
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f, gc_paused():
+            pickle.dump(project, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, os.path.join(cache_dir, key + CACHE_SUFFIX))
+    except BaseException:
+        remove_entry(temp_path)
+        raise
+    evict(cache_dir, max_bytes)
+
+
+def evict(cache_dir: str, max_bytes: int):
+    # Least recently used entries are removed until the cache fits in max_bytes
+    entries = []
+    for filename in os.listdir(cache_dir):
+        if not filename.endswith(CACHE_SUFFIX):
+            continue
+        path = os.path.join(cache_dir, filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        logging.debug(f'Evicting cache entry {path}')
+        remove_entry(path)
+        total_bytes -= size
+
+
+def remove_entry(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -1,32 +1,58 @@
 import argparse
-import json
+import functools
+import io
 import logging
 import pathlib
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
 try:
     from importlib.metadata import version
 except ImportError:
     from importlib_metadata import version
 
-import yaml
-try:
-    from yaml import CLoader as Loader
-except ImportError:
-    from yaml import Loader
-
-
-from . import parser
+from . import api
+from . import batch
+from . import cache
 from . import generator
+from . import parser
+from . import loader
+from . import multi
+from . import incremental
+from . import profiling
+from . import watch
+from . import selector
+from . import writer
 
 MANIFEST_PATH = './manifest.json'
 DEFAULT_LOOKML_OUTPUT_DIR = './lookml'
 
 
-def get_manifest(prefix: str):
+def read_artifact(path: str) -> Optional[bytes]:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def open_artifact(path: str, prefetched: Optional[Dict[str, Optional[bytes]]] = None):
+    if prefetched is None or path not in prefetched:
+        return open(path, 'rb')
+    # Popped, so the raw bytes are freed once the artifact is decoded
+    data = prefetched.pop(path)
+    if data is None:
+        raise FileNotFoundError(path)
+    return io.BytesIO(data)
+
+
+def get_manifest(prefix: str, json_decoder: str = 'auto', prefetched: Optional[Dict[str, Optional[bytes]]] = None):
     manifest_path = os.path.join(prefix, 'manifest.json')
     try:
-        with open(manifest_path, 'r') as f:
-            raw_manifest = json.load(f)
+        with open_artifact(manifest_path, prefetched) as f:
+            raw_manifest = loader.load_json(f, decoder=json_decoder)
     except FileNotFoundError as e:
         logging.error(f'Could not find manifest file at {manifest_path}. Use --target-dir to change the search path for the manifest.json file.')
         raise SystemExit('Failed')
@@ -34,11 +60,26 @@ def get_manifest(prefix: str):
     return raw_manifest
 
 
-def get_catalog(prefix: str):
+def get_streamed_manifest(prefix: str, tag: Optional[str] = None, graph: bool = False):
+    manifest_path = os.path.join(prefix, 'manifest.json')
+    if loader.ijson is None:
+        logging.error('Streaming manifest.json requires the ijson package. Install it with: pip install "dbt2looker[streaming]"')
+        raise SystemExit('Failed')
+    try:
+        with open(manifest_path, 'rb') as f:
+            raw_manifest = loader.stream_raw_manifest(f, tag=tag, graph=graph)
+    except FileNotFoundError as e:
+        logging.error(f'Could not find manifest file at {manifest_path}. Use --target-dir to change the search path for the manifest.json file.')
+        raise SystemExit('Failed')
+    logging.debug(f'Streamed manifest at {manifest_path}')
+    return raw_manifest
+
+
+def get_catalog(prefix: str, json_decoder: str = 'auto', prefetched: Optional[Dict[str, Optional[bytes]]] = None):
     catalog_path = os.path.join(prefix, 'catalog.json')
     try:
-        with open(catalog_path, 'r') as f:
-            raw_catalog = json.load(f)
+        with open_artifact(catalog_path, prefetched) as f:
+            raw_catalog = loader.load_json(f, decoder=json_decoder)
     except FileNotFoundError as e:
         logging.error(f'Could not find catalog file at {catalog_path}. Use --target-dir to change the search path for the catalog.json file.')
         raise SystemExit('Failed')
@@ -46,11 +87,11 @@ def get_catalog(prefix: str):
     return raw_catalog
 
 
-def get_dbt_project_config(prefix: str):
+def get_dbt_project_config(prefix: str, prefetched: Optional[Dict[str, Optional[bytes]]] = None):
     project_path  = os.path.join(prefix, 'dbt_project.yml')
     try:
-        with open(project_path, 'r') as f:
-            project_config = yaml.load(f, Loader=Loader)
+        with open_artifact(project_path, prefetched) as f:
+            project_config = loader.load_yaml(f)
     except FileNotFoundError as e:
         logging.error(f'Could a dbt_project.yml file at {project_path}. Use --project-dir to change the search path for the dbt_project.yml file.')
         raise SystemExit('Failed')
@@ -58,7 +99,303 @@ def get_dbt_project_config(prefix: str):
     return project_config
 
 
-def run():
+def get_optional_catalog(prefix: str, json_decoder: str = 'auto') -> Optional[dict]:
+    catalog_path = os.path.join(prefix, 'catalog.json')
+    if not os.path.exists(catalog_path):
+        logging.warning(f'Could not find catalog file at {catalog_path}. No dimensions will be generated for columns without a declared data_type.')
+        return None
+    return get_catalog(prefix=prefix, json_decoder=json_decoder)
+
+
+def load_artifacts(target_dir: str, project_dir: str, json_decoder: str = 'auto', stream: bool = False, tag: Optional[str] = None, catalog: bool = True, graph: bool = False) -> Tuple[dict, Optional[dict], dict]:
+    # The files are read concurrently so their storage latency overlaps, decoding holds the GIL
+    # and stays sequential. A streamed manifest is never read into memory as a whole.
+    paths = [os.path.join(project_dir, 'dbt_project.yml')]
+    if catalog:
+        paths.append(os.path.join(target_dir, 'catalog.json'))
+    if not stream:
+        paths.append(os.path.join(target_dir, 'manifest.json'))
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        reads = {path: executor.submit(read_artifact, path) for path in paths}
+        if stream:
+            raw_manifest = get_streamed_manifest(prefix=target_dir, tag=tag, graph=graph)
+        prefetched = {path: read.result() for path, read in reads.items()}
+    # The futures hold on to the read bytes as well, only prefetched may reference them
+    del reads
+    if not stream:
+        raw_manifest = get_manifest(prefix=target_dir, json_decoder=json_decoder, prefetched=prefetched)
+    raw_catalog = get_catalog(prefix=target_dir, json_decoder=json_decoder, prefetched=prefetched) if catalog else None
+    raw_config = get_dbt_project_config(prefix=project_dir, prefetched=prefetched)
+    return raw_manifest, raw_catalog, raw_config
+
+
+def select_artifacts(raw_manifest: dict, raw_catalog: dict, select: Optional[List[str]], exclude: Optional[List[str]]):
+    try:
+        return selector.select_artifacts(raw_manifest, raw_catalog, select=select, exclude=exclude)
+    except selector.SelectorError as e:
+        logging.error(str(e))
+        raise SystemExit('Failed')
+
+
+def load_dbt_project(raw_manifest: dict, raw_catalog: api.CatalogSource, raw_config: dict, args: argparse.Namespace, tag: Optional[str] = None, profiler: Optional[profiling.RunProfiler] = None) -> api.DbtProject:
+    try:
+        return api.load_dbt_project(raw_manifest, raw_catalog, raw_config, tag=tag, select=args.select, exclude=args.exclude, profiler=profiler, column_types=args.column_types)
+    except (selector.SelectorError, parser.EmptyModelError) as e:
+        logging.error(str(e))
+        raise SystemExit('Failed')
+
+
+def load_project(args: argparse.Namespace, profiler: profiling.RunProfiler) -> api.DbtProject:
+    cache_key = None
+    if args.cache_dir:
+        catalog_path = os.path.join(args.target_dir, 'catalog.json')
+        cache_key = cache.project_key(
+            [
+                os.path.join(args.target_dir, 'manifest.json'),
+                # Declared column types only need the catalog if there is one
+                *([catalog_path] if args.column_types == 'catalog' or os.path.exists(catalog_path) else []),
+                os.path.join(args.project_dir, 'dbt_project.yml'),
+            ],
+            select=args.select,
+            exclude=args.exclude,
+            column_types=args.column_types,
+        )
+    if cache_key is not None:
+        with profiler.stage('cache_load'):
+            project = cache.load_project(args.cache_dir, cache_key)
+        if project is not None:
+            logging.info(f'Loaded {len(project.models)} dbt models from cache')
+            return project._replace(models=parser.filter_typed_models(project.models, args.tag))
+
+    # Cached projects hold every model so runs with other tags can reuse them
+    tag = None if cache_key is not None else args.tag
+
+    # Load raw manifest, catalog and project config files
+    with profiler.stage('load_artifacts'):
+        raw_manifest, raw_catalog, raw_config = load_artifacts(
+            args.target_dir,
+            args.project_dir,
+            json_decoder=args.json_decoder,
+            stream=args.stream,
+            # Selection needs the whole graph and incremental runs every model id, the tag is applied afterwards
+            tag=None if args.select or args.exclude or args.incremental else tag,
+            catalog=args.column_types == 'catalog',
+            graph=bool(args.select or args.exclude),
+        )
+    if args.column_types == 'manifest':
+        # Only read when a selected column has no declared data_type
+        raw_catalog = functools.partial(get_optional_catalog, prefix=args.target_dir, json_decoder=args.json_decoder)
+
+    project = load_dbt_project(raw_manifest, raw_catalog, raw_config, args, tag=tag, profiler=profiler)
+    if cache_key is not None:
+        with profiler.stage('cache_save'):
+            cache.save_project(args.cache_dir, cache_key, project, max_bytes=int(args.cache_max_size * 2**20))
+        return project._replace(models=parser.filter_typed_models(project.models, args.tag))
+    return project
+
+
+def write_lookml_file(output_dir: str, filename: str, contents: str):
+    path = os.path.join(output_dir, filename)
+    pathlib.Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(contents)
+
+
+def write_lookml_files(output_dir: str, files: Iterable[Tuple[str, str]], stage_seconds: Optional[Dict[str, float]] = None) -> List[str]:
+    # Each file is written as soon as it is generated, the time spent writing is added to stage_seconds
+    filenames = []
+    for filename, contents in files:
+        start = time.perf_counter()
+        write_lookml_file(output_dir, filename, contents)
+        if stage_seconds is not None:
+            stage_seconds['write'] = stage_seconds.get('write', 0.0) + time.perf_counter() - start
+        filenames.append(filename)
+    return filenames
+
+
+def write_streamed_lookml_files(args: argparse.Namespace, project: api.DbtProject, connection_name: str, model_seconds: Optional[dict] = None, stage_seconds: Optional[Dict[str, float]] = None) -> List[str]:
+    # Views are written field by field by the workers, model files are small and written afterwards
+    func = functools.partial(writer.stream_view_files, args.output_dir, adapter_type=project.adapter_type, max_fields=args.view_max_fields)
+    filenames = []
+    refined_views = set()
+    views = generator.iter_timed(generator.imap_models(func, project.models, jobs=args.jobs, model_seconds=model_seconds), 'stream_views', stage_seconds)
+    for model, paths in zip(project.models, views):
+        if len(paths) > 1:
+            refined_views.add(model.name)
+        filenames.extend(paths)
+    if args.model_files == 'model':
+        model_files = (generator.lookml_model_from_dbt_model(model, connection_name, emitter=args.emitter) for model in project.models)
+    else:
+        model_files = generator.lookml_grouped_models_from_dbt_models(project.models, connection_name, args.model_files, project.name, emitter=args.emitter, refined_views=refined_views)
+    model_files = generator.iter_timed(model_files, 'generate_models', stage_seconds)
+    filenames.extend(write_lookml_files(args.output_dir, ((model_file.filename, model_file.contents) for model_file in model_files), stage_seconds))
+    writer.remove_stale_refinements(args.output_dir, filenames)
+    return filenames
+
+
+def report_check_result(output_dir: str, check_result: writer.CheckResult):
+    differences = [
+        (label, path)
+        for label, paths in (('added', check_result.added), ('changed', check_result.changed), ('orphaned', check_result.orphaned))
+        for path in paths
+    ]
+    if not differences:
+        logging.info(f'Lookml in {output_dir} is up to date')
+        return
+    logging.error(
+        f'Lookml in {output_dir} is out of date: {len(check_result.added)} added, '
+        f'{len(check_result.changed)} changed, {len(check_result.orphaned)} orphaned'
+    )
+    for label, path in differences:
+        logging.error(f'  {label:<8} {path}')
+    raise SystemExit('Failed')
+
+
+def write_lookml_archive(archive_path: str, archive_format: Optional[str], files: Iterable[Tuple[str, str]]):
+    archive_format = archive_format or writer.archive_format_from_path(archive_path)
+    if archive_path == '-':
+        sys.stdout.flush()
+        count, total_bytes = writer.write_archive(sys.stdout.buffer, files, archive_format)
+        sys.stdout.buffer.flush()
+    else:
+        with open(archive_path, 'wb') as f:
+            count, total_bytes = writer.write_archive(f, files, archive_format)
+    logging.info(f'Wrote {count} lookml files ({total_bytes} bytes) to {archive_format} archive {"stdout" if archive_path == "-" else archive_path}')
+
+
+def check_distinct_output_dirs(output_dirs: List[str], message: str):
+    absolute_dirs = [os.path.abspath(output_dir) for output_dir in output_dirs]
+    if len(set(absolute_dirs)) < len(absolute_dirs):
+        logging.error(message)
+        raise SystemExit('Failed')
+
+
+def get_batch_targets(args: argparse.Namespace) -> List[batch.BatchTarget]:
+    targets = []
+    try:
+        if args.targets_file:
+            with open(args.targets_file, 'r') as f:
+                targets.extend(batch.load_targets_file(f))
+        targets.extend(batch.parse_target(spec) for spec in args.target or [])
+    except FileNotFoundError:
+        logging.error(f'Could not find targets file at {args.targets_file}')
+        raise SystemExit('Failed')
+    except ValueError as e:
+        logging.error(str(e))
+        raise SystemExit('Failed')
+    check_distinct_output_dirs([target.output_dir for target in targets], 'Every target needs its own output-dir')
+    return targets
+
+
+def run_batch(args: argparse.Namespace, targets: List[batch.BatchTarget], profiler: profiling.RunProfiler):
+    # Artifacts are loaded and validated once for all targets
+    project = load_project(args, profiler)
+    if args.atomic:
+        target_files = [{} for _ in targets]
+        with profiler.interleaved_stages() as stage_seconds:
+            files = batch.iter_batch_files(project, targets, jobs=args.jobs, emitter=args.emitter, model_files=args.model_files, view_max_fields=args.view_max_fields, stage_seconds=stage_seconds)
+            for index, filename, contents in files:
+                target_files[index][filename] = contents
+        with profiler.stage('write'):
+            for target, files_by_name in zip(targets, target_files):
+                writer.write_output_files(target.output_dir, files_by_name, threads=args.write_threads)
+        filenames = [list(files_by_name) for files_by_name in target_files]
+    else:
+        filenames = [[] for _ in targets]
+        with profiler.interleaved_stages() as stage_seconds:
+            files = batch.iter_batch_files(project, targets, jobs=args.jobs, emitter=args.emitter, model_files=args.model_files, view_max_fields=args.view_max_fields, stage_seconds=stage_seconds)
+            for index, filename, contents in files:
+                start = time.perf_counter()
+                write_lookml_file(targets[index].output_dir, filename, contents)
+                if stage_seconds is not None:
+                    stage_seconds['write'] = stage_seconds.get('write', 0.0) + time.perf_counter() - start
+                filenames[index].append(filename)
+        for target, target_filenames in zip(targets, filenames):
+            writer.remove_stale_refinements(target.output_dir, target_filenames)
+    for target, target_filenames in zip(targets, filenames):
+        view_count = sum(1 for filename in target_filenames if filename.startswith('views/'))
+        logging.info(f'Generated {view_count} lookml views and {len(target_filenames) - view_count} lookml models in {target.output_dir}')
+    return len(project.models)
+
+
+def run_projects(args: argparse.Namespace):
+    try:
+        runs = [multi.parse_project_spec(spec, target_dir=args.target_dir, output_dir=args.output_dir) for spec in args.projects]
+    except ValueError as e:
+        logging.error(str(e))
+        raise SystemExit('Failed')
+    check_distinct_output_dirs(
+        [project_run.output_dir for project_run in runs],
+        'Every project needs its own output directory, use a relative --output-dir or set output-dir per project',
+    )
+    project_args = [
+        argparse.Namespace(**{**vars(args), 'projects': None, **project_run._asdict()})
+        for project_run in runs
+    ]
+    results = multi.run_projects(run_project, project_args, workers=args.project_workers)
+    for line in multi.format_summary(results):
+        logging.info(line)
+    if not all(result.succeeded for result in results):
+        raise SystemExit('Failed')
+    logging.info('Success')
+
+
+def regenerate_changed_models(args: argparse.Namespace, state: watch.WatchState):
+    start = time.perf_counter()
+    try:
+        raw_manifest, raw_catalog, raw_config = load_artifacts(args.target_dir, args.project_dir, json_decoder=args.json_decoder)
+        if args.select or args.exclude:
+            raw_manifest, raw_catalog = select_artifacts(raw_manifest, raw_catalog, args.select, args.exclude)
+        update = state.update(raw_manifest, raw_catalog, raw_config)
+    except (SystemExit, ValueError) as e:
+        # Keep watching, dbt may still be writing the artifacts or the project is being edited
+        logging.error(f'Could not parse dbt artifacts, waiting for the next change: {e}')
+        return
+
+    connection_name = args.model_connection or state.project_name
+    try:
+        if args.model_files == 'model':
+            write_lookml_files(args.output_dir, generator.iter_lookml_files(update.changed_models, state.adapter_type, connection_name, jobs=args.jobs, emitter=args.emitter))
+        else:
+            # Consolidated model files hold explores of unchanged models too, so they are always rewritten
+            views = generator.lookml_views_from_dbt_models(update.changed_models, state.adapter_type, jobs=args.jobs, emitter=args.emitter)
+            write_lookml_files(args.output_dir, ((f'views/{view.filename}', view.contents) for view in views))
+            model_files = generator.lookml_grouped_models_from_dbt_models(list(state.typed_models.values()), connection_name, args.model_files, state.project_name, emitter=args.emitter)
+            write_lookml_files(args.output_dir, ((model.filename, model.contents) for model in model_files))
+        incremental.remove_files(args.output_dir, [
+            path
+            for name in update.removed_names
+            for path in (os.path.join('views', f'{name}.view.lkml'), f'{name}.model.lkml')
+        ])
+    except (ValueError, OSError) as e:
+        # Keep watching, the failing models are regenerated once they change again
+        logging.error(f'Could not generate lookml, waiting for the next change: {e}')
+        return
+    logging.info(
+        f'Regenerated {len(update.changed_models)} lookml views and {len(update.changed_models)} lookml models, '
+        f'removed {len(update.removed_names)} in {time.perf_counter() - start:.2f}s'
+    )
+
+
+def run_watch(args: argparse.Namespace):
+    poller = watch.ArtifactPoller([
+        os.path.join(args.target_dir, 'manifest.json'),
+        os.path.join(args.target_dir, 'catalog.json'),
+        os.path.join(args.project_dir, 'dbt_project.yml'),
+    ])
+    state = watch.WatchState(tag=args.tag)
+    regenerate_changed_models(args, state)
+    logging.info(f'Watching {args.target_dir} and {args.project_dir} for changes. Press Ctrl+C to stop')
+    try:
+        while True:
+            time.sleep(args.watch_interval)
+            if poller.poll():
+                regenerate_changed_models(args, state)
+    except KeyboardInterrupt:
+        logging.info('Stopped watching')
+
+
+def build_argparser() -> argparse.ArgumentParser:
     argparser = argparse.ArgumentParser()
     argparser.add_argument(
         '--version',
@@ -82,6 +419,37 @@ def run():
         help='Filter to dbt models using this tag',
         type=str,
     )
+    argparser.add_argument(
+        '--select',
+        help='Select dbt models using dbt node selection syntax, e.g. "+orders", "path:models/marts" or "tag:finance+". Separate criteria with commas to intersect them',
+        nargs='+',
+        type=str,
+    )
+    argparser.add_argument(
+        '--exclude',
+        help='Exclude dbt models using dbt node selection syntax',
+        nargs='+',
+        type=str,
+    )
+    argparser.add_argument(
+        '--stream',
+        help='Stream manifest.json and only load the selected dbt models. Reduces peak memory for large manifests, requires ijson',
+        action='store_true',
+    )
+    argparser.add_argument(
+        '--json-decoder',
+        help='JSON decoder for manifest.json and catalog.json. Default "auto" uses orjson or msgspec when installed',
+        choices=['auto', *loader.JSON_DECODERS],
+        default='auto',
+        type=str,
+    )
+    argparser.add_argument(
+        '--column-types',
+        help='Where column types come from. "catalog" (default) uses catalog.json and skips models missing from it. "manifest" uses the data_type declared on model columns and only reads catalog.json for columns without one',
+        choices=list(parser.COLUMN_TYPE_SOURCES),
+        default='catalog',
+        type=str,
+    )
     argparser.add_argument(
         '--log-level',
         help='Set level of logs. Default is INFO',
@@ -100,44 +468,283 @@ def run():
         help='DB Connection Name for generated model files',
         type=str,
     )
-    args = argparser.parse_args()
+    argparser.add_argument(
+        '--jobs',
+        help='Number of worker processes used to generate lookml files. Default is 1',
+        default=1,
+        type=int,
+    )
+    argparser.add_argument(
+        '--model-files',
+        help='How explores are grouped into .model.lkml files: one file per dbt "model" (default), one file for the whole "project", or one file per dbt "folder", first "tag" or "package". Consolidated model files only include the views their explores use',
+        choices=list(generator.MODEL_FILE_GROUPINGS),
+        default='model',
+        type=str,
+    )
+    argparser.add_argument(
+        '--target',
+        help='Generate several lookml projects from one parse of the dbt artifacts. Repeat for each output, e.g. --target tag=finance,output-dir=lookml/finance,model-connection=warehouse',
+        action='append',
+        type=str,
+    )
+    argparser.add_argument(
+        '--targets-file',
+        help='YAML file with a "targets" list of tag, output-dir and model-connection settings, like --target',
+        type=str,
+    )
+    argparser.add_argument(
+        '--projects',
+        help='Run for several dbt projects in a process pool. Each entry is a project directory, or project-dir=...,target-dir=...,output-dir=... settings. --target-dir and --output-dir are resolved relative to each project directory',
+        nargs='+',
+        type=str,
+    )
+    argparser.add_argument(
+        '--project-workers',
+        help='Number of dbt projects processed at the same time with --projects. Default is the number of CPUs',
+        type=int,
+    )
+    argparser.add_argument(
+        '--cache-dir',
+        help=f'Cache validated dbt models in this directory and reuse them while manifest.json, catalog.json and dbt_project.yml are unchanged, e.g. {cache.DEFAULT_CACHE_DIR}',
+        type=str,
+    )
+    argparser.add_argument(
+        '--cache-max-size',
+        help='Maximum size of --cache-dir in megabytes, least recently used entries are evicted. Default is 512',
+        default=512,
+        type=float,
+    )
+    argparser.add_argument(
+        '--incremental',
+        help='Only regenerate lookml for dbt models that changed since the last incremental run into --output-dir',
+        action='store_true',
+    )
+    argparser.add_argument(
+        '--emitter',
+        help='Serializer used to write lookml. "native" is a faster writer for the lookml generated by dbt2looker. Default is lkml',
+        choices=list(generator.LOOKML_EMITTERS),
+        default='lkml',
+        type=str,
+    )
+    argparser.add_argument(
+        '--stream-views',
+        help='Write each view to its file field by field instead of building it in memory first. Bounds memory for very wide models, always uses the native emitter for views',
+        action='store_true',
+    )
+    argparser.add_argument(
+        '--view-max-fields',
+        help='Split views with more dimensions, dimension groups and measures than this into a base view and +refinement files of at most this many fields',
+        type=int,
+    )
+    argparser.add_argument(
+        '--profile',
+        help='Write a JSON report with the wall time and peak memory of each stage and the slowest models to this path. Adds some overhead to the run',
+        type=str,
+    )
+    argparser.add_argument(
+        '--profile-slowest',
+        help='Number of slowest models listed in the --profile report. Default is 10',
+        default=10,
+        type=int,
+    )
+    argparser.add_argument(
+        '--profile-stats',
+        help='With --profile, also write cProfile stats to this path for use with pstats or snakeviz',
+        type=str,
+    )
+    argparser.add_argument(
+        '--atomic',
+        help='Write all files to a staging directory and swap it into --output-dir. Unchanged files are not rewritten and stale .view.lkml/.model.lkml files are removed',
+        action='store_true',
+    )
+    argparser.add_argument(
+        '--write-threads',
+        help='Number of threads used to write files with --atomic or compare them with --check. Default is 8',
+        default=8,
+        type=int,
+    )
+    argparser.add_argument(
+        '--check',
+        help='Generate lookml in memory and compare it with --output-dir without writing files. Exits with an error listing added, changed and orphaned files when they differ',
+        action='store_true',
+    )
+    argparser.add_argument(
+        '--archive',
+        help='Write the lookml files to a tar or zip archive at this path instead of --output-dir, "-" writes to stdout. Files are added as soon as they are generated',
+        type=str,
+    )
+    argparser.add_argument(
+        '--archive-format',
+        help='Archive format for --archive. Default is inferred from the file extension, or tar',
+        choices=list(writer.ARCHIVE_FORMATS),
+        type=str,
+    )
+    argparser.add_argument(
+        '--watch',
+        help='Keep running and regenerate lookml for changed dbt models whenever manifest.json, catalog.json or dbt_project.yml change',
+        action='store_true',
+    )
+    argparser.add_argument(
+        '--watch-interval',
+        help='Seconds between checks for changed dbt artifacts in --watch mode. Default is 1',
+        default=1.0,
+        type=float,
+    )
+    return argparser
+
+
+def check_args(args: argparse.Namespace):
+    if args.archive and (args.watch or args.incremental or args.atomic):
+        logging.error('--archive can not be combined with --watch, --incremental or --atomic')
+        raise SystemExit('Failed')
+
+    if args.check and (args.watch or args.archive or args.incremental or args.atomic or args.target or args.targets_file):
+        logging.error('--check can not be combined with --watch, --archive, --incremental, --atomic, --target or --targets-file')
+        raise SystemExit('Failed')
+
+    if args.stream_views and (args.watch or args.archive or args.check or args.atomic or args.target or args.targets_file):
+        logging.error('--stream-views can not be combined with --watch, --archive, --check, --atomic, --target or --targets-file')
+        raise SystemExit('Failed')
+
+    if args.view_max_fields is not None and (args.view_max_fields < 1 or args.watch or args.incremental):
+        logging.error('--view-max-fields must be at least 1 and can not be combined with --watch or --incremental')
+        raise SystemExit('Failed')
+
+    if args.watch and (args.atomic or args.incremental or args.stream or args.cache_dir or args.profile):
+        logging.error('--watch can not be combined with --atomic, --incremental, --stream, --cache-dir or --profile')
+        raise SystemExit('Failed')
+
+    if args.column_types == 'manifest' and args.watch:
+        logging.error('--column-types manifest can not be combined with --watch')
+        raise SystemExit('Failed')
+
+    if args.incremental and args.model_files != 'model':
+        logging.error('--incremental can only be used with one model file per dbt model')
+        raise SystemExit('Failed')
+
+    if (args.target or args.targets_file) and (args.tag or args.watch or args.incremental or args.archive):
+        logging.error('--target and --targets-file can not be combined with --tag, --watch, --incremental or --archive')
+        raise SystemExit('Failed')
+
+    if args.projects and (args.watch or args.archive or args.target or args.targets_file or args.profile):
+        logging.error('--projects can not be combined with --watch, --archive, --target, --targets-file or --profile')
+        raise SystemExit('Failed')
+
+
+def run_project(args: argparse.Namespace) -> int:
+    # Runs dbt2looker for a single dbt project, returns the number of dbt models lookml was generated for
+    if args.target or args.targets_file:
+        targets = get_batch_targets(args)
+        profiler = profiling.RunProfiler(enabled=bool(args.profile), cprofile_path=args.profile_stats)
+        profiler.start()
+        model_count = run_batch(args, targets, profiler)
+        if args.profile:
+            profiler.write(args.profile, slowest=args.profile_slowest)
+        return model_count
+
+    profiler = profiling.RunProfiler(enabled=bool(args.profile), cprofile_path=args.profile_stats)
+    profiler.start()
+    model_seconds = {} if args.profile else None
+
+    project = load_project(args, profiler)
+    typed_dbt_models = project.models
+    connection_name = args.model_connection or project.name
+
+    # Stream lookml files into the archive as they are generated instead of collecting them first
+    if args.archive:
+        files = api.generate_lookml_files(project, connection_name, jobs=args.jobs, emitter=args.emitter, model_seconds=model_seconds, model_files=args.model_files, view_max_fields=args.view_max_fields)
+        with profiler.stage('write_archive'):
+            write_lookml_archive(args.archive, args.archive_format, files)
+        if args.profile:
+            profiler.record_model_seconds(model_seconds)
+            profiler.write(args.profile, slowest=args.profile_slowest)
+        return len(project.models)
+
+    # Compare with the existing lookml without writing anything
+    if args.check:
+        files = api.generate_lookml_files(project, connection_name, jobs=args.jobs, emitter=args.emitter, model_seconds=model_seconds, model_files=args.model_files, view_max_fields=args.view_max_fields)
+        with profiler.stage('check'):
+            check_result = writer.check_output_files(args.output_dir, files, threads=args.write_threads)
+        if args.profile:
+            profiler.record_model_seconds(model_seconds)
+            profiler.write(args.profile, slowest=args.profile_slowest)
+        report_check_result(args.output_dir, check_result)
+        return len(project.models)
+
+    # Only regenerate models whose inputs changed since the last incremental run
+    if args.incremental:
+        incremental_plan = incremental.plan_incremental_run(
+            incremental.load_cache(args.output_dir),
+            typed_dbt_models,
+            project.adapter_type,
+            connection_name,
+            args.output_dir,
+            project.model_ids,
+        )
+        project = project._replace(models=incremental_plan.changed_models)
+
+    # Generate and write lookml views and models, files are written as they are generated
+    if args.stream_views:
+        with profiler.interleaved_stages() as stage_seconds:
+            filenames = write_streamed_lookml_files(args, project, connection_name, model_seconds, stage_seconds)
+    elif args.atomic:
+        with profiler.interleaved_stages() as stage_seconds:
+            files = dict(api.generate_lookml_files(project, connection_name, jobs=args.jobs, emitter=args.emitter, model_seconds=model_seconds, model_files=args.model_files, view_max_fields=args.view_max_fields, stage_seconds=stage_seconds))
+        filenames = list(files)
+        with profiler.stage('write'):
+            write_stats = writer.write_output_files(
+                args.output_dir,
+                files,
+                keep=incremental_plan.reused_files + incremental_plan.unselected_files if args.incremental else (),
+                threads=args.write_threads,
+            )
+        logging.info(
+            f'Wrote {write_stats.written} files ({write_stats.bytes_written} bytes), '
+            f'{write_stats.unchanged} unchanged, removed {write_stats.removed} stale files '
+            f'in {write_stats.seconds:.2f}s'
+        )
+    else:
+        with profiler.interleaved_stages() as stage_seconds:
+            files = api.generate_lookml_files(project, connection_name, jobs=args.jobs, emitter=args.emitter, model_seconds=model_seconds, model_files=args.model_files, view_max_fields=args.view_max_fields, stage_seconds=stage_seconds)
+            filenames = write_lookml_files(args.output_dir, files, stage_seconds)
+        writer.remove_stale_refinements(args.output_dir, filenames)
+
+    view_count = sum(1 for filename in filenames if filename.startswith('views/'))
+    logging.info(f'Generated {view_count} lookml views in {os.path.join(args.output_dir, "views")}')
+    logging.info(f'Generated {len(filenames) - view_count} lookml models in {args.output_dir}')
+
+    if args.incremental:
+        incremental.remove_files(args.output_dir, incremental_plan.removed_files)
+        incremental.save_cache(args.output_dir, incremental_plan.cache)
+        logging.info(
+            f'Incremental run reused {len(incremental_plan.reused_files)} files, '
+            f'rewrote {2 * len(project.models)} files '
+            f'and removed {len(incremental_plan.removed_files)} files'
+        )
+
+    if args.profile:
+        profiler.record_model_seconds(model_seconds)
+        profiler.write(args.profile, slowest=args.profile_slowest)
+    return len(project.models)
+
+
+def run():
+    args = build_argparser().parse_args()
     logging.basicConfig(
         level=getattr(logging, args.log_level),
         format='%(asctime)s %(levelname)-6s %(message)s',
         datefmt='%H:%M:%S',
     )
 
-    # Load raw manifest file
-    raw_manifest = get_manifest(prefix=args.target_dir)
-    raw_catalog = get_catalog(prefix=args.target_dir)
-    raw_config = get_dbt_project_config(prefix=args.project_dir)
+    check_args(args)
 
-    # Get dbt models from manifest
-    dbt_project_config = parser.parse_dbt_project_config(raw_config)
-    typed_dbt_models = parser.parse_typed_models(raw_manifest, raw_catalog, tag=args.tag)
-    adapter_type = parser.parse_adapter_type(raw_manifest)
+    if args.projects:
+        run_projects(args)
+        return
 
-    # Generate lookml views
-    lookml_views = [
-        generator.lookml_view_from_dbt_model(model, adapter_type)
-        for model in typed_dbt_models
-    ]
-    pathlib.Path(os.path.join(args.output_dir, 'views')).mkdir(parents=True, exist_ok=True)
-    for view in lookml_views:
-        with open(os.path.join(args.output_dir, 'views', view.filename), 'w') as f:
-            f.write(view.contents)
-
-    logging.info(f'Generated {len(lookml_views)} lookml views in {os.path.join(args.output_dir, "views")}')
-
-    # Generate Lookml models
-    connection_name = args.model_connection or dbt_project_config.name
-    lookml_models = [
-        generator.lookml_model_from_dbt_model(model, connection_name)
-        for model in typed_dbt_models
-    ]
-    for model in lookml_models:
-        with open(os.path.join(args.output_dir, model.filename), 'w') as f:
-            f.write(model.contents)
-    
-    logging.info(f'Generated {len(lookml_models)} lookml models in {args.output_dir}')
+    if args.watch:
+        run_watch(args)
+        return
+
+    run_project(args)
     logging.info('Success')
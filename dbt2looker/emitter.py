@@ -0,0 +1,109 @@
+# Serializes the view and model dicts built in generator.py to the same text as lkml.dump,
+# writing strings directly instead of building and rendering an lkml parse tree
+from typing import IO, Callable, Optional
+
+from lkml.keys import EXPR_BLOCK_KEYS, QUOTED_LITERAL_KEYS
+
+INDENT = '  '
+QUOTED_KEYS = frozenset(QUOTED_LITERAL_KEYS)
+EXPRESSION_KEYS = frozenset(EXPR_BLOCK_KEYS)
+PLURAL_KEYS = {
+    'includes': 'include',
+    'views': 'view',
+    'explores': 'explore',
+    'joins': 'join',
+    'dimension_groups': 'dimension_group',
+    'dimensions': 'dimension',
+    'measures': 'measure',
+}
+
+BLOCK = 'block'
+VALUE = 'value'
+
+
+def quote(value: str) -> str:
+    return '"' + value.replace(r'\"', '"').replace('"', r'\"') + '"'
+
+
+def format_value(key: str, value: str, force_quote: bool = False) -> str:
+    if force_quote or key in QUOTED_KEYS:
+        return quote(value)
+    if key in EXPRESSION_KEYS:
+        return f'{value.strip()} ;;'
+    return value
+
+
+def prefix(level: int, previous: Optional[str], kind: str) -> str:
+    # Blocks are separated from their neighbours by a blank line, other fields by a newline
+    if previous is None:
+        return '' if level == 0 else '\n' + INDENT * level
+    if kind == BLOCK or previous == BLOCK:
+        return '\n\n' + INDENT * level
+    return '\n' + INDENT * level
+
+
+def write_list(write: Callable[[str], None], key: str, values: list, level: int):
+    inner = '\n' + INDENT * (level + 1)
+    if values and isinstance(values[0], dict):
+        force_quote = key == 'filters'
+        items = [
+            f'{inner}{name}: {format_value(name, value, force_quote and name != "field")}'
+            for item in values
+            for name, value in item.items()
+        ]
+        write(f'{key}: [' + ','.join(items) + ',\n' + INDENT * level + ']')
+    elif len(values) >= 5:
+        write(f'{key}: [' + ','.join(inner + format_value(key, value) for value in values) + ',\n' + INDENT * level + ']')
+    else:
+        write(f'{key}: [' + ', '.join(format_value(key, value) for value in values) + ']')
+
+
+def write_block(write: Callable[[str], None], key: str, block: dict, level: int):
+    name = block.get('name')
+    write(f'{key}: {name} {{' if name else f'{key}: {{')
+    if write_fields(write, {k: v for k, v in block.items() if k != 'name'}, level + 1):
+        write('\n' + INDENT * level + '}')
+    else:
+        write('}')
+
+
+def write_fields(write: Callable[[str], None], fields: dict, level: int) -> bool:
+    previous = None
+    for key, value in fields.items():
+        if isinstance(value, str):
+            write(prefix(level, previous, VALUE) + f'{key}: {format_value(key, value)}')
+            previous = VALUE
+        elif isinstance(value, dict):
+            write(prefix(level, previous, BLOCK))
+            write_block(write, key, value, level)
+            previous = BLOCK
+        elif key == 'filters__all':
+            # lkml.load groups repeated filter lists under this key
+            for filters in value:
+                write(prefix(level, previous, VALUE))
+                write_list(write, 'filters', filters, level)
+                previous = VALUE
+        elif key in PLURAL_KEYS:
+            singular_key = PLURAL_KEYS[key]
+            for item in value:
+                if isinstance(item, dict):
+                    write(prefix(level, previous, BLOCK))
+                    write_block(write, singular_key, item, level)
+                    previous = BLOCK
+                else:
+                    write(prefix(level, previous, VALUE) + f'{singular_key}: {format_value(singular_key, item)}')
+                    previous = VALUE
+        else:
+            write(prefix(level, previous, VALUE))
+            write_list(write, key, value, level)
+            previous = VALUE
+    return previous is not None
+
+
+def dump(obj: dict, file_object: Optional[IO] = None) -> Optional[str]:
+    if file_object:
+        write_fields(file_object.write, obj, 0)
+        return None
+    chunks = []
+    write_fields(chunks.append, obj, 0)
+    return ''.join(chunks)
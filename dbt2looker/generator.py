@@ -1,9 +1,21 @@
+import functools
+import itertools
 import logging
 import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
 import lkml
 
 from . import models
+from . import emitter as native_emitter
+
+LOOKML_EMITTERS = {
+    'lkml': lkml.dump,
+    'native': native_emitter.dump,
+}
 
 LOOKER_DTYPE_MAP = {
     'bigquery': {
@@ -180,6 +192,8 @@ looker_date_time_types = ['datetime', 'timestamp']
 looker_date_types = ['date']
 looker_scalar_types = ['number', 'yesno', 'string']
 
+MODEL_FILE_GROUPINGS = ('model', 'project', 'folder', 'tag', 'package')
+
 looker_timeframes = [
     'raw',
     'time',
@@ -191,104 +205,169 @@ looker_timeframes = [
 ]
 
 
+class ModelField(NamedTuple):
+    column: models.DbtTypedColumn
+    name: str
+    looker_type: Optional[str]
+    measures: Dict[str, models.Dbt2LookerMeasure]
+
+
+class FieldIndex(NamedTuple):
+    fields: Dict[str, ModelField]
+    date_times: List[ModelField]
+    dates: List[ModelField]
+    scalars: List[ModelField]
+    unsupported: List[ModelField]
+
+
 def normalise_spark_types(column_type: str) -> str:
     return re.match(r'^[^\(]*', column_type).group(0)
 
 
+@functools.lru_cache(maxsize=None)
 def map_adapter_type_to_looker(adapter_type: models.SupportedDbtAdapters, column_type: str):
+    # Memoised per adapter and raw catalog type, so each unsupported type is only reported once
+    if column_type is None:
+        return None
     normalised_column_type = (normalise_spark_types(column_type) if adapter_type == models.SupportedDbtAdapters.spark.value else column_type).upper()
     looker_type = LOOKER_DTYPE_MAP[adapter_type].get(normalised_column_type)
-    if (column_type is not None) and (looker_type is None):
-        logging.warning(f'Column type {column_type} not supported for conversion from {adapter_type} to looker. No dimension will be created.')
+    if looker_type is None:
+        logging.warning(f'Column type {column_type} not supported for conversion from {adapter_type} to looker. No dimension will be created for columns of this type.')
     return looker_type
 
 
-def lookml_date_time_dimension_group(column: models.DbtModelColumn, adapter_type: models.SupportedDbtAdapters):
+def build_field_index(model: models.DbtTypedModel, adapter_type: Optional[models.SupportedDbtAdapters]) -> FieldIndex:
+    # Resolves dimension names, looker types and measures once per model for all lookml builders.
+    # Without an adapter type only names and measures are resolved.
+    index = FieldIndex(fields={}, date_times=[], dates=[], scalars=[], unsupported=[])
+    for column_name, column in model.columns.items():
+        meta = column.meta
+        field = ModelField(
+            column=column,
+            name=meta.dimension.name or column.name,
+            looker_type=None if adapter_type is None else map_adapter_type_to_looker(adapter_type, column.data_type),
+            measures={**meta.measures, **meta.measure, **meta.metrics, **meta.metric},
+        )
+        index.fields[column_name] = field
+        if field.looker_type in looker_date_time_types:
+            index.date_times.append(field)
+        elif field.looker_type in looker_date_types:
+            index.dates.append(field)
+        elif field.looker_type in looker_scalar_types:
+            index.scalars.append(field)
+        elif column.data_type is not None and adapter_type is not None:
+            index.unsupported.append(field)
+    if index.unsupported:
+        logging.debug(
+            'Model %s has %d columns with unsupported types: %s',
+            model.unique_id,
+            len(index.unsupported),
+            ', '.join(f'{field.column.name} ({field.column.data_type})' for field in index.unsupported),
+        )
+    return index
+
+
+def lookml_date_time_dimension_group(field: ModelField):
+    column = field.column
     return {
-        'name': column.meta.dimension.name or column.name,
+        'name': field.name,
         'type': 'time',
         'sql': column.meta.dimension.sql or f'${{TABLE}}.{column.name}',
         'description': column.meta.dimension.description or column.description,
-        'datatype': map_adapter_type_to_looker(adapter_type, column.data_type),
+        'datatype': field.looker_type,
         'timeframes': ['raw', 'time', 'hour', 'date', 'week', 'month', 'quarter', 'year']
     }
 
 
-def lookml_date_dimension_group(column: models.DbtModelColumn, adapter_type: models.SupportedDbtAdapters):
+def lookml_date_dimension_group(field: ModelField):
+    column = field.column
     return {
-        'name': column.meta.dimension.name or column.name,
+        'name': field.name,
         'type': 'time',
         'sql': column.meta.dimension.sql or f'${{TABLE}}.{column.name}',
         'description': column.meta.dimension.description or column.description,
-        'datatype': map_adapter_type_to_looker(adapter_type, column.data_type),
+        'datatype': field.looker_type,
         'timeframes': ['raw', 'date', 'week', 'month', 'quarter', 'year']
     }
 
 
-def lookml_dimension_groups_from_model(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters):
+def lookml_dimension_groups_from_model(model: models.DbtTypedModel, adapter_type: models.SupportedDbtAdapters, field_index: Optional[FieldIndex] = None):
+    field_index = field_index or build_field_index(model, adapter_type)
     date_times = [
-        lookml_date_time_dimension_group(column, adapter_type)
-        for column in model.columns.values()
-        if map_adapter_type_to_looker(adapter_type, column.data_type) in looker_date_time_types
+        lookml_date_time_dimension_group(field)
+        for field in field_index.date_times
     ]
     dates = [
-        lookml_date_dimension_group(column, adapter_type)
-        for column in model.columns.values()
-        if column.meta.dimension.enabled
-        and map_adapter_type_to_looker(adapter_type, column.data_type) in looker_date_types
+        lookml_date_dimension_group(field)
+        for field in field_index.dates
+        if field.column.meta.dimension.enabled
     ]
     return date_times + dates
 
 
-def lookml_dimensions_from_model(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters):
+def lookml_dimension(field: ModelField):
+    column = field.column
+    dimension = {
+        'name': field.name,
+        'type': field.looker_type,
+        'sql': column.meta.dimension.sql or f'${{TABLE}}.{column.name}',
+        'description': column.meta.dimension.description or column.description,
+    }
+    if column.meta.dimension.value_format_name and field.looker_type == 'number':
+        dimension['value_format_name'] = column.meta.dimension.value_format_name.value
+    return dimension
+
+
+def lookml_dimensions_from_model(model: models.DbtTypedModel, adapter_type: models.SupportedDbtAdapters, field_index: Optional[FieldIndex] = None):
+    field_index = field_index or build_field_index(model, adapter_type)
     return [
-        {
-            'name': column.meta.dimension.name or column.name,
-            'type': map_adapter_type_to_looker(adapter_type, column.data_type),
-            'sql': column.meta.dimension.sql or f'${{TABLE}}.{column.name}',
-            'description': column.meta.dimension.description or column.description,
-            **(
-                {'value_format_name': column.meta.dimension.value_format_name.value}
-                if (column.meta.dimension.value_format_name
-                    and map_adapter_type_to_looker(adapter_type, column.data_type) == 'number')
-                else {}
-            )
-        }
-        for column in model.columns.values()
-        if column.meta.dimension.enabled
-        and map_adapter_type_to_looker(adapter_type, column.data_type) in looker_scalar_types
+        lookml_dimension(field)
+        for field in field_index.scalars
+        if field.column.meta.dimension.enabled
     ]
 
 
-def lookml_measure_filters(measure: models.Dbt2LookerMeasure, model: models.DbtModel):
-    try:
-        columns = {
-            column_name: model.columns[column_name]
-            for f in measure.filters
-            for column_name in f
-        }
-    except KeyError as e:
+def lookml_measure_filters(measure: models.Dbt2LookerMeasure, field_index: FieldIndex, missing_columns: Optional[List[str]] = None):
+    # Filters on columns missing from the model are added to missing_columns, or raise a KeyError without it
+    filters = []
+    for f in measure.filters:
+        resolved = {}
+        for column_name, fexpr in f.items():
+            field = field_index.fields.get(column_name)
+            if field is not None:
+                resolved[field.name] = fexpr
+            elif missing_columns is not None:
+                missing_columns.append(column_name)
+            else:
+                raise KeyError(column_name)
+        filters.append(resolved)
+    return filters
+
+
+def iter_lookml_measures(model: models.DbtTypedModel, field_index: Optional[FieldIndex] = None) -> Iterator[dict]:
+    field_index = field_index or build_field_index(model, None)
+    missing = []
+    for field in field_index.fields.values():
+        for measure_name, measure in field.measures.items():
+            missing_columns = []
+            yield lookml_measure(measure_name, field, measure, field_index, missing_columns)
+            missing.extend((measure_name, column_name) for column_name in missing_columns)
+    if missing:
+        # Every filter on a missing column of the model is reported at once
+        column_names = ', '.join(sorted({repr(column_name) for _, column_name in missing}))
         raise ValueError(
-            f'Model {model.unique_id} contains a measure that references a non_existent column: {e}\n'
-            f'Ensure that dbt model {model.unique_id} contains a column: {e}'
-        ) from e
-    return [{
-        (columns[column_name].meta.dimension.name or column_name): fexpr
-        for column_name, fexpr in f.items()
-    } for f in measure.filters]
+            f'Model {model.unique_id} contains measures that reference non_existent columns: '
+            f'{", ".join(f"{measure_name} ({column_name!r})" for measure_name, column_name in missing)}\n'
+            f'Ensure that dbt model {model.unique_id} contains the columns: {column_names}'
+        )
 
 
-def lookml_measures_from_model(model: models.DbtModel):
-    return [
-        lookml_measure(measure_name, column, measure, model)
-        for column in model.columns.values()
-        for measure_name, measure in {
-            **column.meta.measures, **column.meta.measure, **column.meta.metrics, **column.meta.metric
-        }.items()
-    ]
+def lookml_measures_from_model(model: models.DbtTypedModel, field_index: Optional[FieldIndex] = None):
+    return list(iter_lookml_measures(model, field_index))
 
 
-def lookml_measure(measure_name: str, column: models.DbtModelColumn, measure: models.Dbt2LookerMeasure, model: models.DbtModel):
+def lookml_measure(measure_name: str, field: ModelField, measure: models.Dbt2LookerMeasure, field_index: FieldIndex, missing_columns: Optional[List[str]] = None):
+    column = field.column
     m = {
         'name': measure_name,
         'type': measure.type.value,
@@ -296,7 +375,7 @@ def lookml_measure(measure_name: str, column: models.DbtModelColumn, measure: mo
         'description': measure.description or column.description or f'{measure.type.value.capitalize()} of {column.name}',
     }
     if measure.filters:
-        m['filters'] = lookml_measure_filters(measure, model)
+        m['filters'] = lookml_measure_filters(measure, field_index, missing_columns)
     if measure.value_format_name:
         m['value_format_name'] = measure.value_format_name.value
     if measure.group_label:
@@ -308,14 +387,15 @@ def lookml_measure(measure_name: str, column: models.DbtModelColumn, measure: mo
     return m
 
 
-def lookml_view_from_dbt_model(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters):
+def lookml_view_from_dbt_model(model: models.DbtTypedModel, adapter_type: models.SupportedDbtAdapters, emitter: str = 'lkml'):
+    field_index = build_field_index(model, adapter_type)
     lookml = {
         'view': {
             'name': model.name,
             'sql_table_name': model.relation_name,
-            'dimension_groups': lookml_dimension_groups_from_model(model, adapter_type),
-            'dimensions': lookml_dimensions_from_model(model, adapter_type),
-            'measures': lookml_measures_from_model(model),
+            'dimension_groups': lookml_dimension_groups_from_model(model, adapter_type, field_index),
+            'dimensions': lookml_dimensions_from_model(model, adapter_type, field_index),
+            'measures': lookml_measures_from_model(model, field_index),
         }
     }
     logging.debug(
@@ -324,31 +404,247 @@ def lookml_view_from_dbt_model(model: models.DbtModel, adapter_type: models.Supp
         len(lookml['view']['measures']),
         len(lookml['view']['dimensions']),
     )
-    contents = lkml.dump(lookml)
+    contents = LOOKML_EMITTERS[emitter](lookml)
     filename = f'{model.name}.view.lkml'
     return models.LookViewFile(filename=filename, contents=contents)
 
 
-def lookml_model_from_dbt_model(model: models.DbtModel, connection_name: str):
+def lazy_lookml_view_fields(model: models.DbtTypedModel, field_index: FieldIndex) -> Dict[str, Iterator[dict]]:
+    # The fields of lookml_view_from_dbt_model, built one at a time while they are consumed.
+    # Only the native emitter serializes these iterators without collecting them first.
+    return {
+        'dimension_groups': itertools.chain(
+            (lookml_date_time_dimension_group(field) for field in field_index.date_times),
+            (lookml_date_dimension_group(field) for field in field_index.dates if field.column.meta.dimension.enabled),
+        ),
+        'dimensions': (lookml_dimension(field) for field in field_index.scalars if field.column.meta.dimension.enabled),
+        'measures': iter_lookml_measures(model, field_index),
+    }
+
+
+def refinement_filename(view_name: str, part: int) -> str:
+    # Sorts after the base view file, so wildcard includes load the base view first
+    return f'{view_name}__refinement_{part}.view.lkml'
+
+
+def iter_lookml_view_parts(model: models.DbtTypedModel, adapter_type: models.SupportedDbtAdapters, max_fields: Optional[int] = None) -> Iterator[Tuple[str, dict]]:
+    # Yields (filename, lookml) for the view of a model. Without max_fields the fields are generated
+    # while the native emitter writes the view. With max_fields the view is split into a base view
+    # and +refinements holding at most max_fields fields each.
+    view_fields = lazy_lookml_view_fields(model, build_field_index(model, adapter_type))
+    if max_fields is None:
+        yield f'{model.name}.view.lkml', {'view': {'name': model.name, 'sql_table_name': model.relation_name, **view_fields}}
+        return
+    fields = ((key, field) for key, key_fields in view_fields.items() for field in key_fields)
+    for part in itertools.count():
+        chunk = list(itertools.islice(fields, max_fields))
+        if part and not chunk:
+            return
+        view = {'name': model.name, 'sql_table_name': model.relation_name} if part == 0 else {'name': f'+{model.name}'}
+        for key in view_fields:
+            view[key] = [field for field_key, field in chunk if field_key == key]
+        yield f'{model.name}.view.lkml' if part == 0 else refinement_filename(model.name, part), {'view': view}
+        if len(chunk) < max_fields:
+            return
+
+
+def lookml_view_files_from_dbt_model(model: models.DbtTypedModel, adapter_type: models.SupportedDbtAdapters, emitter: str = 'lkml', max_fields: Optional[int] = None) -> List[models.LookViewFile]:
+    if max_fields is None:
+        return [lookml_view_from_dbt_model(model, adapter_type, emitter=emitter)]
+    return [
+        models.LookViewFile(filename=filename, contents=LOOKML_EMITTERS[emitter](lookml))
+        for filename, lookml in iter_lookml_view_parts(model, adapter_type, max_fields)
+    ]
+
+
+def lookml_explore_from_dbt_model(model: models.DbtTypedModel) -> dict:
+    return {
+        'name': model.name,
+        'description': model.description,
+        'joins': [
+            {
+                'name': join.join,
+                'type': join.type.value,
+                'relationship': join.relationship.value,
+                'sql_on': join.sql_on,
+            }
+            for join in model.meta.joins
+        ]
+    }
+
+
+def lookml_model_from_dbt_model(model: models.DbtTypedModel, connection_name: str, emitter: str = 'lkml'):
     # Note: assumes view names = model names
     #       and models are unique across dbt packages in project
     lookml = {
         'connection': connection_name,
         'include': '/views/*',
-        'explore': {
-            'name': model.name,
-            'description': model.description,
-            'joins': [
-                {
-                    'name': join.join,
-                    'type': join.type.value,
-                    'relationship': join.relationship.value,
-                    'sql_on': join.sql_on,
-                }
-                for join in model.meta.joins
-            ]
-        }
+        'explore': lookml_explore_from_dbt_model(model),
     }
-    contents = lkml.dump(lookml)
+    contents = LOOKML_EMITTERS[emitter](lookml)
     filename = f'{model.name}.model.lkml'
     return models.LookModelFile(filename=filename, contents=contents)
+
+
+def model_file_group(model: models.DbtTypedModel, model_files: str, project_name: str) -> str:
+    if model_files == 'folder' and model.original_file_path:
+        # Drop the model-paths directory (usually "models") and the file name
+        folders = model.original_file_path.replace('\\', '/').split('/')[1:-1]
+        group = '_'.join(folders)
+    elif model_files == 'tag' and model.tags:
+        group = model.tags[0]
+    elif model_files == 'package' and model.package_name:
+        group = model.package_name
+    else:
+        group = project_name
+    return re.sub(r'\W+', '_', group) or project_name
+
+
+def lookml_model_from_dbt_models(dbt_models: List[models.DbtTypedModel], connection_name: str, name: str, emitter: str = 'lkml', refined_views: Set[str] = frozenset(), generated_views: Optional[Set[str]] = None):
+    # One model file holding the explores of several dbt models, only including the views they use.
+    # Joined views that are not in generated_views, by default the views of dbt_models, are not included.
+    if generated_views is None:
+        generated_views = {model.name for model in dbt_models}
+    views = {model.name for model in dbt_models}
+    for model in dbt_models:
+        for join in model.meta.joins:
+            if join.join in generated_views:
+                views.add(join.join)
+            else:
+                logging.warning(f'Explore {model.name} in {name}.model.lkml joins view {join.join}, which is not generated and not included')
+    includes = []
+    for view in sorted(views):
+        includes.append(f'/views/{view}.view.lkml')
+        if view in refined_views:
+            includes.append(f'/views/{refinement_filename(view, "*")}')
+    lookml = {
+        'connection': connection_name,
+        'includes': includes,
+        'explores': [lookml_explore_from_dbt_model(model) for model in dbt_models],
+    }
+    contents = LOOKML_EMITTERS[emitter](lookml)
+    filename = f'{name}.model.lkml'
+    return models.LookModelFile(filename=filename, contents=contents)
+
+
+def lookml_grouped_models_from_dbt_models(dbt_models: List[models.DbtTypedModel], connection_name: str, model_files: str, project_name: str, emitter: str = 'lkml', refined_views: Set[str] = frozenset()):
+    # refined_views are split into +refinement files that have to be included after the base view
+    groups: Dict[str, List[models.DbtTypedModel]] = {}
+    for model in dbt_models:
+        groups.setdefault(model_file_group(model, model_files, project_name), []).append(model)
+    generated_views = {model.name for model in dbt_models}
+    return [
+        lookml_model_from_dbt_models(group_models, connection_name, name, emitter=emitter, refined_views=refined_views, generated_views=generated_views)
+        for name, group_models in sorted(groups.items())
+    ]
+
+
+def timed_call(func: Callable, model: models.DbtTypedModel):
+    start = time.perf_counter()
+    result = func(model)
+    return result, time.perf_counter() - start
+
+
+def map_models(func: Callable, dbt_models: List[models.DbtTypedModel], jobs: int = 1, model_seconds: Optional[Dict[str, float]] = None) -> list:
+    # Results keep the order of dbt_models so parallel output matches a serial run
+    if model_seconds is not None:
+        timed_results = map_models(functools.partial(timed_call, func), dbt_models, jobs=jobs)
+        for model, (_, seconds) in zip(dbt_models, timed_results):
+            model_seconds[model.unique_id] = model_seconds.get(model.unique_id, 0.0) + seconds
+        return [result for result, _ in timed_results]
+    if jobs <= 1 or len(dbt_models) <= 1:
+        return [func(model) for model in dbt_models]
+    chunksize = max(1, len(dbt_models) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(func, dbt_models, chunksize=chunksize))
+
+
+def imap_models(func: Callable, dbt_models: List[models.DbtTypedModel], jobs: int = 1, model_seconds: Optional[Dict[str, float]] = None) -> Iterator:
+    # Lazy version of map_models, at most jobs * 4 results are in flight at once
+    if model_seconds is not None:
+        for model, (result, seconds) in zip(dbt_models, imap_models(functools.partial(timed_call, func), dbt_models, jobs=jobs)):
+            model_seconds[model.unique_id] = model_seconds.get(model.unique_id, 0.0) + seconds
+            yield result
+        return
+    if jobs <= 1 or len(dbt_models) <= 1:
+        for model in dbt_models:
+            yield func(model)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for model in dbt_models:
+            pending.append(executor.submit(func, model))
+            if len(pending) >= jobs * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_timed(items: Iterable, stage: str, stage_seconds: Optional[Dict[str, float]] = None) -> Iterator:
+    # Adds the time spent producing each item to stage_seconds[stage], for stages that are interleaved with writing
+    if stage_seconds is None:
+        yield from items
+        return
+    items = iter(items)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(items)
+        except StopIteration:
+            return
+        stage_seconds[stage] = stage_seconds.get(stage, 0.0) + time.perf_counter() - start
+        yield item
+
+
+def lookml_files_from_dbt_model(model: models.DbtTypedModel, adapter_type: models.SupportedDbtAdapters, connection_name: str, emitter: str = 'lkml', view_max_fields: Optional[int] = None):
+    # Returns the view files, the model file and the seconds spent generating each, as workers generate both at once
+    start = time.perf_counter()
+    views = lookml_view_files_from_dbt_model(model, adapter_type, emitter=emitter, max_fields=view_max_fields)
+    generated = time.perf_counter()
+    model_file = lookml_model_from_dbt_model(model, connection_name, emitter=emitter)
+    return views, model_file, {'generate_views': generated - start, 'generate_models': time.perf_counter() - generated}
+
+
+def iter_lookml_files(
+    dbt_models: List[models.DbtTypedModel],
+    adapter_type: models.SupportedDbtAdapters,
+    connection_name: str,
+    jobs: int = 1,
+    emitter: str = 'lkml',
+    model_seconds: Optional[Dict[str, float]] = None,
+    model_files: str = 'model',
+    project_name: Optional[str] = None,
+    view_max_fields: Optional[int] = None,
+    stage_seconds: Optional[Dict[str, float]] = None,
+) -> Iterator[Tuple[str, str]]:
+    # Yields (path relative to the output directory, contents) as soon as each model is generated.
+    # The time spent generating views and models is added to stage_seconds.
+    if model_files != 'model':
+        # Views are still streamed, the consolidated model files follow once all views are written
+        func = functools.partial(lookml_view_files_from_dbt_model, adapter_type=adapter_type, emitter=emitter, max_fields=view_max_fields)
+        refined_views = set()
+        for model, views in zip(dbt_models, iter_timed(imap_models(func, dbt_models, jobs=jobs, model_seconds=model_seconds), 'generate_views', stage_seconds)):
+            if len(views) > 1:
+                refined_views.add(model.name)
+            for view in views:
+                yield f'views/{view.filename}', view.contents
+        grouped_models = lookml_grouped_models_from_dbt_models(dbt_models, connection_name, model_files, project_name or connection_name, emitter=emitter, refined_views=refined_views)
+        for model in iter_timed(grouped_models, 'generate_models', stage_seconds):
+            yield model.filename, model.contents
+        return
+    func = functools.partial(lookml_files_from_dbt_model, adapter_type=adapter_type, connection_name=connection_name, emitter=emitter, view_max_fields=view_max_fields)
+    for views, model, seconds in imap_models(func, dbt_models, jobs=jobs, model_seconds=model_seconds):
+        if stage_seconds is not None:
+            for stage, stage_time in seconds.items():
+                stage_seconds[stage] = stage_seconds.get(stage, 0.0) + stage_time
+        for view in views:
+            yield f'views/{view.filename}', view.contents
+        yield model.filename, model.contents
+
+
+def lookml_views_from_dbt_models(dbt_models: List[models.DbtTypedModel], adapter_type: models.SupportedDbtAdapters, jobs: int = 1, emitter: str = 'lkml', model_seconds: Optional[Dict[str, float]] = None):
+    return map_models(functools.partial(lookml_view_from_dbt_model, adapter_type=adapter_type, emitter=emitter), dbt_models, jobs=jobs, model_seconds=model_seconds)
+
+
+def lookml_models_from_dbt_models(dbt_models: List[models.DbtTypedModel], connection_name: str, jobs: int = 1, emitter: str = 'lkml', model_seconds: Optional[Dict[str, float]] = None):
+    return map_models(functools.partial(lookml_model_from_dbt_model, connection_name=connection_name, emitter=emitter), dbt_models, jobs=jobs, model_seconds=model_seconds)
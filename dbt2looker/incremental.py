@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+import os
+from typing import AbstractSet, Dict, List, NamedTuple
+try:
+    from importlib.metadata import version
+except ImportError:
+    from importlib_metadata import version
+
+from pydantic.json import pydantic_encoder
+
+from . import models
+
+CACHE_FILENAME = '.dbt2looker_cache.json'
+
+
+class IncrementalPlan(NamedTuple):
+    changed_models: List[models.DbtTypedModel]
+    reused_files: List[str]
+    unselected_files: List[str]
+    removed_files: List[str]
+    cache: Dict[str, dict]
+
+
+def model_output_files(model: models.DbtTypedModel) -> List[str]:
+    return [
+        os.path.join('views', f'{model.name}.view.lkml'),
+        f'{model.name}.model.lkml',
+    ]
+
+
+def model_hash(model: models.DbtTypedModel, adapter_type: models.SupportedDbtAdapters, connection_name: str) -> str:
+    # Typed models already carry the catalog column types, the only catalog fields used for generation.
+    # Keys are not sorted, the order of columns and measures is the order of the generated fields.
+    inputs = json.dumps({
+        'model': model,
+        'adapter_type': adapter_type,
+        'connection_name': connection_name,
+    }, default=pydantic_encoder)
+    return hashlib.sha256(inputs.encode('utf-8')).hexdigest()
+
+
+def load_cache(output_dir: str) -> Dict[str, dict]:
+    cache_path = os.path.join(output_dir, CACHE_FILENAME)
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        logging.warning(f'Ignoring unreadable incremental cache at {cache_path}')
+        return {}
+    if cache.get('version') != version('dbt2looker'):
+        logging.debug('Incremental cache was written by another dbt2looker version, regenerating all files')
+        return {}
+    return cache.get('models', {})
+
+
+def save_cache(output_dir: str, cache: Dict[str, dict]):
+    with open(os.path.join(output_dir, CACHE_FILENAME), 'w') as f:
+        json.dump({'version': version('dbt2looker'), 'models': cache}, f, indent=2, sort_keys=True)
+
+
+def plan_incremental_run(
+    cache: Dict[str, dict],
+    dbt_models: List[models.DbtTypedModel],
+    adapter_type: models.SupportedDbtAdapters,
+    connection_name: str,
+    output_dir: str,
+    model_ids: AbstractSet[str],
+) -> IncrementalPlan:
+    # model_ids holds every model in the manifest. Models outside the tag or selection of this run
+    # keep their files and cache entries, only files of models removed from the manifest are removed.
+    changed_models = []
+    reused_files = []
+    new_cache = {}
+    for model in dbt_models:
+        files = model_output_files(model)
+        entry = {'hash': model_hash(model, adapter_type, connection_name), 'files': files}
+        new_cache[model.unique_id] = entry
+        if cache.get(model.unique_id) == entry and all(os.path.exists(os.path.join(output_dir, path)) for path in files):
+            reused_files.extend(files)
+        else:
+            changed_models.append(model)
+
+    unselected_files = []
+    for unique_id, entry in cache.items():
+        if unique_id in model_ids and unique_id not in new_cache:
+            new_cache[unique_id] = entry
+            unselected_files.extend(entry.get('files', []))
+
+    current_files = {path for entry in new_cache.values() for path in entry.get('files', [])}
+    removed_files = sorted({
+        path
+        for unique_id, entry in cache.items()
+        if unique_id not in new_cache
+        for path in entry.get('files', [])
+        if path not in current_files
+    })
+    return IncrementalPlan(
+        changed_models=changed_models,
+        reused_files=reused_files,
+        unselected_files=unselected_files,
+        removed_files=removed_files,
+        cache=new_cache,
+    )
+
+
+def remove_files(output_dir: str, paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(os.path.join(output_dir, path))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,117 @@
+import json
+import logging
+from typing import IO, BinaryIO, Callable, Dict, Iterator, Optional, Tuple, Union
+
+import yaml
+try:
+    from yaml import CLoader as YamlLoader
+except ImportError:
+    from yaml import Loader as YamlLoader
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def decode_json_stdlib(data: bytes):
+    return json.loads(data)
+
+
+def decode_json_orjson(data: bytes):
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # orjson rejects some documents the stdlib accepts, e.g. integers over 64 bits
+        return json.loads(data)
+
+
+def decode_json_msgspec(data: bytes):
+    try:
+        return msgspec.json.decode(data)
+    except msgspec.DecodeError:
+        return json.loads(data)
+
+
+JSON_DECODERS: Dict[str, Callable[[bytes], object]] = {'json': decode_json_stdlib}
+if orjson is not None:
+    JSON_DECODERS['orjson'] = decode_json_orjson
+if msgspec is not None:
+    JSON_DECODERS['msgspec'] = decode_json_msgspec
+
+
+def decode_json(data: Union[bytes, str], decoder: str = 'auto'):
+    # 'auto' uses the fastest installed decoder, falling back to the json module
+    if decoder == 'auto':
+        decoder = next((name for name in ('orjson', 'msgspec') if name in JSON_DECODERS), 'json')
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return JSON_DECODERS[decoder](data)
+
+
+def load_json(f: IO, decoder: str = 'auto'):
+    return decode_json(f.read(), decoder=decoder)
+
+
+def load_yaml(f: IO):
+    return yaml.load(f, Loader=YamlLoader)
+
+
+def parse_settings(spec: str, kind: str) -> Dict[str, str]:
+    # e.g. "tag=finance,output-dir=lookml/finance", kind names the settings in errors
+    values = {}
+    for setting in spec.split(','):
+        key, separator, value = setting.partition('=')
+        if not separator:
+            raise ValueError(f'Could not parse {kind} setting "{setting}", expected key=value')
+        values[key.strip()] = value.strip()
+    return values
+
+
+def check_settings(values: Dict[str, str], keys: Tuple[str, ...], kind: str) -> Dict[str, str]:
+    # Settings may be spelled with dashes like on the command line, e.g. output-dir
+    values = {key.replace('-', '_'): value for key, value in values.items()}
+    unknown = sorted(set(values) - set(keys))
+    if unknown:
+        raise ValueError(f'Unknown {kind} setting {", ".join(unknown)}. Use one of: {", ".join(key.replace("_", "-") for key in keys)}')
+    return values
+
+
+def raw_tags_match(query_tag: str, raw_node: dict) -> bool:
+    tags = raw_node.get('tags')
+    if isinstance(tags, str):
+        return query_tag == tags
+    return tags is not None and query_tag in tags
+
+
+def iter_raw_model_nodes(f: BinaryIO, tag: Optional[str] = None) -> Iterator[Tuple[str, dict]]:
+    # Only one raw node is held in memory at a time, everything that isn't a selected model is dropped
+    for unique_id, raw_node in ijson.kvitems(f, 'nodes', use_float=True):
+        if raw_node.get('resource_type') != 'model':
+            continue
+        if tag is not None and not raw_tags_match(tag, raw_node):
+            continue
+        yield unique_id, raw_node
+
+
+def stream_raw_manifest(f: BinaryIO, tag: Optional[str] = None, graph: bool = False) -> dict:
+    metadata = next(ijson.items(f, 'metadata', use_float=True), {})
+    f.seek(0)
+    nodes = dict(iter_raw_model_nodes(f, tag=tag))
+    logging.debug('Streamed %d model nodes from manifest', len(nodes))
+    raw_manifest = {'metadata': metadata, 'nodes': nodes}
+    if graph:
+        # Node selection traverses the dbt graph, also through nodes that are not streamed
+        f.seek(0)
+        parent_map = next(ijson.items(f, 'parent_map'), None)
+        if parent_map is not None:
+            raw_manifest['parent_map'] = parent_map
+    return raw_manifest
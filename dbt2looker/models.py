@@ -1,5 +1,6 @@
+from collections.abc import Mapping
 from enum import Enum
-from typing import Union, Dict, List, Optional
+from typing import Union, Dict, List, NamedTuple, Optional
 try:
     from typing import Literal
 except ImportError:
@@ -170,13 +171,13 @@ class DbtModel(DbtNode):
     columns: Dict[str, DbtModelColumn]
     tags: List[str]
     meta: DbtModelMeta
+    package_name: Optional[str]
+    original_file_path: Optional[str]
 
     @validator('columns')
     def case_insensitive_column_names(cls, v: Dict[str, DbtModelColumn]):
-        return {
-            name.lower(): column.copy(update={'name': column.name.lower()})
-            for name, column in v.items()
-        }
+        # Column names are lowercased when typed models are built, only the keys are normalised here
+        return {name.lower(): column for name, column in v.items()}
 
 
 class DbtManifestMetadata(BaseModel):
@@ -217,11 +218,60 @@ class DbtCatalogNode(BaseModel):
 
     @validator('columns')
     def case_insensitive_column_names(cls, v: Dict[str, DbtCatalogNodeColumn]):
-        return {
-            name.lower(): column.copy(update={'name': column.name.lower()})
-            for name, column in v.items()
-        }
+        return {name.lower(): column for name, column in v.items()}
+
+
+class DbtCatalogNodes(Mapping):
+    # Raw catalog nodes are validated the first time a model looks them up, so catalog
+    # entries for sources and unselected models are never validated
+    def __init__(self, raw_nodes: Dict[str, dict]):
+        self.raw_nodes = raw_nodes
+        self.validated_nodes: Dict[str, DbtCatalogNode] = {}
+
+    def __getitem__(self, unique_id: str) -> DbtCatalogNode:
+        node = self.validated_nodes.get(unique_id)
+        if node is None:
+            node = self.validated_nodes[unique_id] = DbtCatalogNode(**self.raw_nodes[unique_id])
+        return node
+
+    def __contains__(self, unique_id) -> bool:
+        return unique_id in self.raw_nodes
+
+    def __iter__(self):
+        return iter(self.raw_nodes)
+
+    def __len__(self) -> int:
+        return len(self.raw_nodes)
 
 
 class DbtCatalog(BaseModel):
-    nodes: Dict[str, DbtCatalogNode]
\ No newline at end of file
+    nodes: Dict[str, DbtCatalogNode]
+
+
+# dbt2looker parsed project
+class DbtParsedProject(BaseModel):
+    manifest: DbtManifest
+    catalog: Optional[DbtCatalog]
+    config: DbtProjectConfig
+
+
+# dbt2looker typed models
+# Lightweight immutable records consumed by the generator, built in one pass from a
+# validated DbtModel and its catalog node without copying the pydantic models
+class DbtTypedColumn(NamedTuple):
+    name: str
+    description: str
+    data_type: Optional[str]
+    meta: DbtModelColumnMeta
+
+
+class DbtTypedModel(NamedTuple):
+    unique_id: str
+    name: str
+    relation_name: str
+    description: str
+    columns: Dict[str, DbtTypedColumn]
+    tags: List[str]
+    meta: DbtModelMeta
+    package_name: Optional[str] = None
+    original_file_path: Optional[str] = None
@@ -0,0 +1,110 @@
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, NamedTuple, Optional
+
+from . import loader
+
+PROJECT_KEYS = ('project_dir', 'target_dir', 'output_dir')
+
+
+class ProjectRun(NamedTuple):
+    project_dir: str
+    target_dir: str
+    output_dir: str
+
+
+class ProjectResult(NamedTuple):
+    project_dir: str
+    succeeded: bool
+    model_count: int
+    seconds: float
+    error: Optional[str] = None
+
+
+class ErrorCollector(logging.Handler):
+    # Keeps the error logged before a SystemExit, which only carries "Failed"
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.messages.append(record.getMessage())
+
+
+def parse_project_spec(spec: str, target_dir: str, output_dir: str) -> ProjectRun:
+    # A plain directory, or e.g. "project-dir=analytics,target-dir=analytics/target,output-dir=lookml/analytics"
+    if '=' not in spec:
+        return ProjectRun(
+            project_dir=spec,
+            target_dir=os.path.normpath(os.path.join(spec, target_dir)),
+            output_dir=os.path.normpath(os.path.join(spec, output_dir)),
+        )
+    values = loader.check_settings(loader.parse_settings(spec, 'project'), PROJECT_KEYS, 'project')
+    if not values.get('project_dir'):
+        raise ValueError(f'Project "{spec}" needs a project-dir')
+    project_dir = values['project_dir']
+    return ProjectRun(
+        project_dir=project_dir,
+        target_dir=values.get('target_dir') or os.path.normpath(os.path.join(project_dir, target_dir)),
+        output_dir=values.get('output_dir') or os.path.normpath(os.path.join(project_dir, output_dir)),
+    )
+
+
+def run_project_in_worker(run_project: Callable[[argparse.Namespace], int], args: argparse.Namespace) -> ProjectResult:
+    root = logging.getLogger()
+    if not root.handlers:
+        # Worker processes that were spawned instead of forked start without logging configured
+        logging.basicConfig(level=getattr(logging, args.log_level))
+    for handler in root.handlers:
+        handler.setFormatter(logging.Formatter(f'%(asctime)s %(levelname)-6s [{args.project_dir}] %(message)s', datefmt='%H:%M:%S'))
+    collector = ErrorCollector()
+    root.addHandler(collector)
+    start = time.perf_counter()
+    try:
+        model_count = run_project(args)
+    except (SystemExit, Exception) as e:
+        # One broken project must not stop the others
+        if not isinstance(e, SystemExit):
+            logging.exception(f'Failed to generate lookml for {args.project_dir}')
+        error = collector.messages[-1] if collector.messages else str(e)
+        return ProjectResult(project_dir=args.project_dir, succeeded=False, model_count=0, seconds=time.perf_counter() - start, error=error)
+    finally:
+        root.removeHandler(collector)
+    return ProjectResult(project_dir=args.project_dir, succeeded=True, model_count=model_count, seconds=time.perf_counter() - start)
+
+
+def run_projects(run_project: Callable[[argparse.Namespace], int], project_args: List[argparse.Namespace], workers: Optional[int] = None) -> List[ProjectResult]:
+    # Results keep the order of project_args
+    workers = min(workers or os.cpu_count() or 1, len(project_args))
+    results: List[Optional[ProjectResult]] = [None] * len(project_args)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(run_project_in_worker, run_project, args): index
+            for index, args in enumerate(project_args)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                # The worker process itself died, e.g. it ran out of memory
+                results[index] = ProjectResult(project_dir=project_args[index].project_dir, succeeded=False, model_count=0, seconds=0.0, error=repr(e))
+            result = results[index]
+            logging.info(f'{"Finished" if result.succeeded else "Failed"} {result.project_dir} in {result.seconds:.2f}s ({sum(r is not None for r in results)}/{len(results)})')
+    return results
+
+
+def format_summary(results: List[ProjectResult]) -> List[str]:
+    width = max(len('Project'), *(len(result.project_dir) for result in results))
+    lines = [f'{"Project":<{width}}  Status  Models  Seconds']
+    for result in results:
+        line = f'{result.project_dir:<{width}}  {"ok" if result.succeeded else "failed":<6}  {result.model_count:>6}  {result.seconds:>7.2f}'
+        if result.error:
+            line += f'  {result.error}'
+        lines.append(line)
+    failed = sum(1 for result in results if not result.succeeded)
+    lines.append(f'{len(results) - failed} of {len(results)} projects succeeded, {sum(result.model_count for result in results)} dbt models in total')
+    return lines
@@ -1,21 +1,45 @@
+import functools
 import logging
-from typing import Dict, Optional, List
+import re
+import sys
+from typing import Callable, Dict, Optional, List
 from functools import reduce
 
 from . import models
 
+COLUMN_TYPE_SOURCES = ('catalog', 'manifest')
+
+
+class EmptyModelError(ValueError):
+    pass
+
 
 def parse_dbt_project_config(raw_config: dict):
     return models.DbtProjectConfig(**raw_config)
 
 
-def parse_catalog_nodes(raw_catalog: dict):
-    catalog = models.DbtCatalog(**raw_catalog)
-    return catalog.nodes
+def parse_catalog(raw_catalog: dict) -> models.DbtCatalog:
+    # Catalog nodes are validated lazily when a model needs its column types
+    if not isinstance(raw_catalog.get('nodes'), dict):
+        return models.DbtCatalog(**raw_catalog)
+    return models.DbtCatalog.construct(nodes=models.DbtCatalogNodes(raw_catalog['nodes']))
+
+
+def parse_project(raw_manifest: dict, raw_catalog: Optional[dict], raw_config: dict) -> models.DbtParsedProject:
+    # Validate each artifact exactly once, all other parsers reuse the result.
+    # Without a catalog only declared column types are available.
+    return models.DbtParsedProject.construct(
+        manifest=models.DbtManifest(**raw_manifest),
+        catalog=None if raw_catalog is None else parse_catalog(raw_catalog),
+        config=parse_dbt_project_config(raw_config),
+    )
+
+
+def parse_catalog_nodes(catalog: Optional[models.DbtCatalog]):
+    return {} if catalog is None else catalog.nodes
 
 
-def parse_adapter_type(raw_manifest: dict):
-    manifest = models.DbtManifest(**raw_manifest)
+def parse_adapter_type(manifest: models.DbtManifest):
     return manifest.metadata.adapter_type
 
 
@@ -29,8 +53,7 @@ def tags_match(query_tag: str, model: models.DbtModel) -> bool:
         return query_tag == model.tags
 
 
-def parse_models(raw_manifest: dict, tag=None) -> List[models.DbtModel]:
-    manifest = models.DbtManifest(**raw_manifest)
+def parse_models(manifest: models.DbtManifest, tag=None) -> List[models.DbtModel]:
     all_models: List[models.DbtModel] = [
         node
         for node in manifest.nodes.values()
@@ -40,24 +63,33 @@ def parse_models(raw_manifest: dict, tag=None) -> List[models.DbtModel]:
     # Empty model files have many missing parameters
     for model in all_models:
         if not hasattr(model, 'name'):
-            logging.error('Cannot parse model with id: "%s" - is the model file empty?', model.unique_id)
-            raise SystemExit('Failed')
+            raise EmptyModelError(f'Cannot parse model with id: "{model.unique_id}" - is the model file empty?')
 
     if tag is None:
         return all_models
     return [model for model in all_models if tags_match(tag, model)]
 
 
-def check_models_for_missing_column_types(dbt_typed_models: List[models.DbtModel]):
+def filter_typed_models(dbt_typed_models: List[models.DbtTypedModel], tag: Optional[str] = None) -> List[models.DbtTypedModel]:
+    if tag is None:
+        return dbt_typed_models
+    return [model for model in dbt_typed_models if tags_match(tag, model)]
+
+
+def check_models_for_missing_column_types(dbt_typed_models: List[models.DbtTypedModel]):
     for model in dbt_typed_models:
         if all([col.data_type is None for col in model.columns.values()]):
             logging.debug('Model %s has no typed columns, no dimensions will be generated. %s', model.unique_id, model)
 
 
-def parse_typed_models(raw_manifest: dict, raw_catalog: dict, tag: Optional[str] = None):
-    catalog_nodes = parse_catalog_nodes(raw_catalog)
-    dbt_models = parse_models(raw_manifest, tag=tag)
-    adapter_type = parse_adapter_type(raw_manifest)
+def undeclared_column_count(dbt_models: List[models.DbtModel]) -> int:
+    return sum(1 for model in dbt_models for column in model.columns.values() if not column.data_type)
+
+
+def parse_typed_models(project: models.DbtParsedProject, tag: Optional[str] = None, column_types: str = 'catalog') -> List[models.DbtTypedModel]:
+    catalog_nodes = parse_catalog_nodes(project.catalog)
+    dbt_models = parse_models(project.manifest, tag=tag)
+    adapter_type = parse_adapter_type(project.manifest)
 
     logging.debug('Parsed %d models from manifest.json', len(dbt_models))
     for model in dbt_models:
@@ -68,6 +100,23 @@ def parse_typed_models(raw_manifest: dict, raw_catalog: dict, tag: Optional[str]
             reduce(lambda acc, col: acc + len(col.meta.measures) + len(col.meta.measure) + len(col.meta.metrics) + len(col.meta.metric), model.columns.values(), 0)
         )
 
+    if column_types == 'manifest':
+        # Declared data types win, catalog nodes are only validated for models with undeclared columns.
+        # Like without declared types, models with undeclared columns are skipped when the catalog misses them.
+        dbt_typed_models = []
+        for model in dbt_models:
+            catalog_node = None
+            if undeclared_column_count([model]) and project.catalog is not None:
+                if model.unique_id not in catalog_nodes:
+                    logging.warning(
+                        f'Model {model.unique_id} has columns without a declared data_type and is not found in catalog. '
+                        f'No looker view will be generated. Check if model has materialized in {adapter_type} at {model.relation_name}')
+                    continue
+                catalog_node = catalog_nodes[model.unique_id]
+            dbt_typed_models.append(typed_model(model, declared_or_catalog_column_type(catalog_node)))
+        check_models_for_missing_column_types(dbt_typed_models)
+        return dbt_typed_models
+
     # Check catalog for models
     for model in dbt_models:
         if model.unique_id not in catalog_nodes:
@@ -75,14 +124,9 @@ def parse_typed_models(raw_manifest: dict, raw_catalog: dict, tag: Optional[str]
                 f'Model {model.unique_id} not found in catalog. No looker view will be generated. '
                 f'Check if model has materialized in {adapter_type} at {model.relation_name}')
 
-    # Update dbt models with data types from catalog
+    # Join data types from catalog onto dbt models
     dbt_typed_models = [
-        model.copy(update={'columns': {
-            column.name: column.copy(update={
-                'data_type': get_column_type_from_catalog(catalog_nodes, model.unique_id, column.name)
-            })
-            for column in model.columns.values()
-        }})
+        typed_model(model, catalog_column_type(catalog_nodes[model.unique_id]))
         for model in dbt_models
         if model.unique_id in catalog_nodes
     ]
@@ -92,6 +136,60 @@ def parse_typed_models(raw_manifest: dict, raw_catalog: dict, tag: Optional[str]
     return dbt_typed_models
 
 
+ColumnTypeResolver = Callable[[str, models.DbtModelColumn], Optional[str]]
+
+
+def typed_model(model: models.DbtModel, column_type: ColumnTypeResolver) -> models.DbtTypedModel:
+    # column_type returns the data type of a model column from its name and the column
+    columns = {
+        name: models.DbtTypedColumn(
+            name=column.name.lower(),
+            description=column.description,
+            data_type=column_type(name, column),
+            meta=column.meta,
+        )
+        for name, column in model.columns.items()
+    }
+    return models.DbtTypedModel(
+        unique_id=model.unique_id,
+        name=model.name,
+        relation_name=model.relation_name,
+        description=model.description,
+        columns=columns,
+        tags=model.tags,
+        meta=model.meta,
+        package_name=model.package_name,
+        original_file_path=model.original_file_path,
+    )
+
+
+def catalog_column_type(catalog_node: Optional[models.DbtCatalogNode]) -> ColumnTypeResolver:
+    catalog_columns = {} if catalog_node is None else catalog_node.columns
+
+    def column_type(name: str, column: models.DbtModelColumn) -> Optional[str]:
+        catalog_column = catalog_columns.get(name)
+        return None if catalog_column is None else sys.intern(catalog_column.type)
+
+    return column_type
+
+
+@functools.lru_cache(maxsize=None)
+def declared_column_type(data_type: str) -> str:
+    # Declared types often carry a length or precision, e.g. varchar(256) or number(38,0)
+    return sys.intern(re.sub(r'\s*\([^)]*\)', '', data_type).strip())
+
+
+def declared_or_catalog_column_type(catalog_node: Optional[models.DbtCatalogNode]) -> ColumnTypeResolver:
+    from_catalog = catalog_column_type(catalog_node)
+
+    def column_type(name: str, column: models.DbtModelColumn) -> Optional[str]:
+        if column.data_type:
+            return declared_column_type(column.data_type)
+        return from_catalog(name, column)
+
+    return column_type
+
+
 def get_column_type_from_catalog(catalog_nodes: Dict[str, models.DbtCatalogNode], model_id: str, column_name: str):
     node = catalog_nodes.get(model_id)
     column = None if node is None else node.columns.get(column_name)
@@ -0,0 +1,83 @@
+import contextlib
+import cProfile
+import json
+import logging
+import time
+import tracemalloc
+from typing import Dict, Optional
+
+
+class RunProfiler:
+    def __init__(self, enabled: bool = False, cprofile_path: Optional[str] = None):
+        self.enabled = enabled
+        self.cprofile_path = cprofile_path
+        self.stages: Dict[str, dict] = {}
+        self.model_seconds: Dict[str, float] = {}
+        self._cprofile = cProfile.Profile() if enabled and cprofile_path else None
+        self._start = time.perf_counter()
+
+    def start(self):
+        self._start = time.perf_counter()
+        if self._cprofile:
+            self._cprofile.enable()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        # Entering the same stage more than once accumulates its wall time and keeps the highest peak
+        if not self.enabled:
+            yield
+            return
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self.record_stage(name, seconds, peak_bytes)
+
+    @contextlib.contextmanager
+    def interleaved_stages(self):
+        # Yields a dict the code running interleaved stages, like generating and writing each file, adds
+        # the seconds of each stage to. The stages share the peak memory of the whole block.
+        if not self.enabled:
+            yield None
+            return
+        stage_seconds: Dict[str, float] = {}
+        tracemalloc.start()
+        try:
+            yield stage_seconds
+        finally:
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            for name, seconds in stage_seconds.items():
+                self.record_stage(name, seconds, peak_bytes)
+
+    def record_stage(self, name: str, seconds: float, peak_bytes: int):
+        stage = self.stages.setdefault(name, {'seconds': 0.0, 'peak_bytes': 0})
+        stage['seconds'] += seconds
+        stage['peak_bytes'] = max(stage['peak_bytes'], peak_bytes)
+
+    def record_model_seconds(self, model_seconds: Dict[str, float]):
+        for unique_id, seconds in model_seconds.items():
+            self.model_seconds[unique_id] = self.model_seconds.get(unique_id, 0.0) + seconds
+
+    def report(self, slowest: int = 10) -> dict:
+        return {
+            'total_seconds': time.perf_counter() - self._start,
+            'stages': self.stages,
+            'slowest_models': [
+                {'unique_id': unique_id, 'seconds': seconds}
+                for unique_id, seconds in sorted(self.model_seconds.items(), key=lambda item: item[1], reverse=True)[:slowest]
+            ],
+        }
+
+    def write(self, report_path: str, slowest: int = 10):
+        if self._cprofile:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            logging.info(f'Wrote cProfile stats to {self.cprofile_path}')
+        with open(report_path, 'w') as f:
+            json.dump(self.report(slowest=slowest), f, indent=2)
+        logging.info(f'Wrote profile report to {report_path}')
@@ -0,0 +1,135 @@
+import fnmatch
+import logging
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+from . import loader
+
+SELECTOR_PATTERN = re.compile(r'^(?:(?P<parents_depth>\d*)(?P<parents>\+))?(?:(?P<method>\w+):)?(?P<value>.+?)(?:(?P<children>\+)(?P<children_depth>\d*))?$')
+
+
+class SelectorError(ValueError):
+    pass
+
+
+class ManifestGraph:
+    def __init__(self, raw_manifest: dict):
+        nodes = raw_manifest.get('nodes', {})
+        parent_map = raw_manifest.get('parent_map')
+        if parent_map is None:
+            # Older manifests without maps, rebuild the edges from each node's dependencies
+            parent_map = {
+                unique_id: node.get('depends_on', {}).get('nodes', [])
+                for unique_id, node in nodes.items()
+            }
+        child_map = raw_manifest.get('child_map')
+        if child_map is None:
+            child_map = {}
+            for unique_id, parents in parent_map.items():
+                for parent in parents:
+                    child_map.setdefault(parent, []).append(unique_id)
+        self.nodes = nodes
+        self.parent_map: Dict[str, List[str]] = parent_map
+        self.child_map: Dict[str, List[str]] = child_map
+
+    def traverse(self, start: Iterable[str], edges: Dict[str, List[str]], depth: Optional[int] = None) -> Set[str]:
+        found = set()
+        queue = deque((unique_id, 0) for unique_id in start)
+        while queue:
+            unique_id, distance = queue.popleft()
+            if depth is not None and distance >= depth:
+                continue
+            for neighbour in edges.get(unique_id, []):
+                if neighbour not in found:
+                    found.add(neighbour)
+                    queue.append((neighbour, distance + 1))
+        return found
+
+    def ancestors(self, start: Iterable[str], depth: Optional[int] = None) -> Set[str]:
+        return self.traverse(start, self.parent_map, depth)
+
+    def descendants(self, start: Iterable[str], depth: Optional[int] = None) -> Set[str]:
+        return self.traverse(start, self.child_map, depth)
+
+
+def path_matches(value: str, raw_node: dict) -> bool:
+    node_path = raw_node.get('original_file_path') or ''
+    value = value.rstrip('/')
+    return node_path == value or node_path.startswith(value + '/') or fnmatch.fnmatch(node_path, value)
+
+
+def fqn_matches(value: str, raw_node: dict) -> bool:
+    if fnmatch.fnmatch(raw_node.get('name') or '', value):
+        return True
+    fqn = raw_node.get('fqn') or []
+    parts = value.split('.')
+    # A fully qualified name may include or leave out the package name
+    return fqn[:len(parts)] == parts or fqn[1:len(parts) + 1] == parts
+
+
+def method_matches(method: str, value: str, raw_node: dict) -> bool:
+    if method == 'tag':
+        return loader.raw_tags_match(value, raw_node)
+    if method == 'path':
+        return path_matches(value, raw_node)
+    if method == 'package':
+        return raw_node.get('package_name') == value
+    if method == 'fqn':
+        return fqn_matches(value, raw_node)
+    raise SelectorError(f'Unsupported selector method "{method}". Use one of: tag, path, package, fqn')
+
+
+def select_criterion(graph: ManifestGraph, criterion: str) -> Set[str]:
+    match = SELECTOR_PATTERN.match(criterion)
+    if match is None:
+        raise SelectorError(f'Could not parse selector "{criterion}"')
+    method = match.group('method') or 'fqn'
+    value = match.group('value')
+    selected = {
+        unique_id
+        for unique_id, raw_node in graph.nodes.items()
+        if method_matches(method, value, raw_node)
+    }
+    if not selected:
+        logging.warning(f'The selection criterion "{criterion}" does not match any nodes')
+    if match.group('parents'):
+        selected |= graph.ancestors(selected, int(match.group('parents_depth')) if match.group('parents_depth') else None)
+    if match.group('children'):
+        selected |= graph.descendants(selected, int(match.group('children_depth')) if match.group('children_depth') else None)
+    return selected
+
+
+def select_selector(graph: ManifestGraph, selector: str) -> Set[str]:
+    # Comma separated criteria are intersected, like dbt
+    selections = [select_criterion(graph, criterion) for criterion in selector.split(',')]
+    return set.intersection(*selections)
+
+
+def select_node_ids(raw_manifest: dict, select: Optional[List[str]] = None, exclude: Optional[List[str]] = None) -> Set[str]:
+    graph = ManifestGraph(raw_manifest)
+    if select:
+        selected = set().union(*(select_selector(graph, selector) for selector in select))
+    else:
+        selected = set(graph.nodes)
+    for selector in exclude or []:
+        selected -= select_selector(graph, selector)
+    return selected
+
+
+def select_artifacts(raw_manifest: dict, raw_catalog: Optional[dict], select: Optional[List[str]] = None, exclude: Optional[List[str]] = None):
+    # Runs on the raw artifacts, so only the selected models are validated and joined with the catalog
+    selected = select_node_ids(raw_manifest, select=select, exclude=exclude)
+    nodes = {
+        unique_id: raw_node
+        for unique_id, raw_node in raw_manifest.get('nodes', {}).items()
+        if unique_id in selected and raw_node.get('resource_type') == 'model'
+    }
+    logging.debug('Selected %d models', len(nodes))
+    if raw_catalog is None:
+        return {**raw_manifest, 'nodes': nodes}, None
+    catalog_nodes = raw_catalog.get('nodes', {})
+    return (
+        {**raw_manifest, 'nodes': nodes},
+        {**raw_catalog, 'nodes': {unique_id: catalog_nodes[unique_id] for unique_id in nodes if unique_id in catalog_nodes}},
+    )
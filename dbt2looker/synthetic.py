@@ -0,0 +1,204 @@
+"""Generate a synthetic dbt project (dbt_project.yml, manifest.json and catalog.json).
+
+The generated artifacts only contain the fields dbt2looker reads, at a configurable
+scale, for the benchmarks and tests. Write a project with:
+
+    python -m dbt2looker.synthetic /tmp/bench_project --models 4000 --columns 50 --adapter snowflake
+"""
+import argparse
+import json
+import os
+import random
+from typing import Dict, List
+
+from .models import SupportedDbtAdapters
+
+PROJECT_NAME = 'synthetic'
+
+CATALOG_TYPES = {
+    SupportedDbtAdapters.bigquery.value: ['INT64', 'STRING', 'TIMESTAMP', 'DATE', 'BOOL', 'NUMERIC', 'FLOAT64', 'DATETIME'],
+    SupportedDbtAdapters.postgres.value: ['integer', 'text', 'timestamp without time zone', 'date', 'boolean', 'numeric', 'bigint', 'character varying'],
+    SupportedDbtAdapters.redshift.value: ['integer', 'character varying', 'timestamp without time zone', 'date', 'boolean', 'numeric', 'bigint', 'double precision'],
+    SupportedDbtAdapters.snowflake.value: ['NUMBER', 'TEXT', 'TIMESTAMP_NTZ', 'DATE', 'BOOLEAN', 'FLOAT', 'VARCHAR', 'VARIANT'],
+    SupportedDbtAdapters.spark.value: ['integer', 'string', 'timestamp', 'date', 'boolean', 'decimal(18,2)', 'long', 'varchar(255)'],
+}
+NON_MODEL_RESOURCE_TYPES = ['test', 'test', 'test', 'seed', 'snapshot', 'analysis']
+MEASURE_TYPES = ['sum', 'count', 'count_distinct', 'average', 'max', 'min']
+FOLDERS = ['staging', 'intermediate', 'marts/finance', 'marts/marketing']
+TAGS = ['prod', 'finance', 'marketing', 'daily']
+
+
+def column_name(index: int) -> str:
+    return f'column_{index}'
+
+
+def model_columns(n_columns: int, measures_per_column: int, filters_per_measure: int, rng: random.Random, declared_types: List[str] = ()) -> Dict[str, dict]:
+    # The first len(declared_types) columns declare the data_type the catalog reports for them
+    columns = {}
+    for i in range(n_columns):
+        measures = {}
+        for m in range(measures_per_column):
+            measure = {'type': rng.choice(MEASURE_TYPES), 'description': f'Measure {m} of "{column_name(i)}"'}
+            if filters_per_measure:
+                measure['filters'] = [
+                    {column_name(rng.randrange(n_columns)): '-NULL'}
+                    for _ in range(filters_per_measure)
+                ]
+                measure['group_label'] = 'Filtered'
+            measures[f'{column_name(i)}_measure_{m}'] = measure
+        meta = {'measures': measures} if measures else {}
+        if i % 7 == 3:
+            meta['dimension'] = {'name': f'{column_name(i)}_renamed', 'value_format_name': 'decimal_2'}
+        columns[column_name(i)] = {
+            'name': column_name(i),
+            'description': f'Description of {column_name(i)}',
+            'data_type': declared_types[i] if i < len(declared_types) else None,
+            'meta': meta,
+        }
+    return columns
+
+
+def manifest_model(index: int, columns: Dict[str, dict], parents: List[str], rng: random.Random) -> dict:
+    folder = FOLDERS[index % len(FOLDERS)]
+    name = f'model_{index}'
+    return {
+        'unique_id': f'model.{PROJECT_NAME}.{name}',
+        'resource_type': 'model',
+        'package_name': PROJECT_NAME,
+        'path': f'{folder}/{name}.sql',
+        'original_file_path': f'models/{folder}/{name}.sql',
+        'fqn': [PROJECT_NAME, *folder.split('/'), name],
+        'relation_name': f'"analytics"."{folder.split("/")[0]}"."{name}"',
+        'schema': folder.split('/')[0],
+        'name': name,
+        'description': f'Synthetic model {index}',
+        'columns': columns,
+        'tags': rng.sample(TAGS, k=rng.randint(0, 2)),
+        'meta': {'joins': [
+            {'join': parent.split('.')[-1], 'sql_on': f'${{{name}.column_0}} = ${{{parent.split(".")[-1]}.column_0}}'}
+            for parent in parents
+        ]},
+        'depends_on': {'nodes': parents, 'macros': []},
+    }
+
+
+def catalog_node(model: dict, adapter_type: str) -> dict:
+    types = CATALOG_TYPES[adapter_type]
+    return {
+        'unique_id': model['unique_id'],
+        'metadata': {'type': 'table', 'schema': model['schema'], 'name': model['name'], 'comment': None, 'owner': None},
+        'columns': {
+            name.upper(): {'type': types[i % len(types)], 'index': i, 'name': name.upper(), 'comment': None}
+            for i, name in enumerate(model['columns'])
+        },
+        'stats': {},
+    }
+
+
+def non_model_node(index: int, resource_type: str, model_ids: List[str], rng: random.Random) -> dict:
+    name = f'{resource_type}_{index}'
+    return {
+        'unique_id': f'{resource_type}.{PROJECT_NAME}.{name}',
+        'resource_type': resource_type,
+        'package_name': PROJECT_NAME,
+        'name': name,
+        'raw_sql': 'select 1 ' * 50,
+        'depends_on': {'nodes': rng.sample(model_ids, k=min(1, len(model_ids))), 'macros': []},
+    }
+
+
+def generate_artifacts(
+    n_models: int = 100,
+    n_columns: int = 20,
+    measures_per_column: int = 1,
+    filters_per_measure: int = 0,
+    non_model_share: float = 0.5,
+    adapter_type: str = SupportedDbtAdapters.postgres.value,
+    seed: int = 0,
+    declared_share: float = 0.0,
+):
+    rng = random.Random(seed)
+    types = CATALOG_TYPES[adapter_type]
+    declared_types = [types[i % len(types)] for i in range(round(n_columns * declared_share))]
+    nodes = {}
+    catalog_nodes = {}
+    model_ids = []
+    for i in range(n_models):
+        parents = [model_ids[rng.randrange(len(model_ids))]] if model_ids and i % 3 else []
+        model = manifest_model(i, model_columns(n_columns, measures_per_column, filters_per_measure, rng, declared_types), parents, rng)
+        nodes[model['unique_id']] = model
+        catalog_nodes[model['unique_id']] = catalog_node(model, adapter_type)
+        model_ids.append(model['unique_id'])
+
+    n_non_models = round(n_models * non_model_share / (1 - non_model_share)) if non_model_share < 1 else 0
+    for i in range(n_non_models):
+        node = non_model_node(i, NON_MODEL_RESOURCE_TYPES[i % len(NON_MODEL_RESOURCE_TYPES)], model_ids, rng)
+        nodes[node['unique_id']] = node
+
+    parent_map = {unique_id: list(node['depends_on']['nodes']) for unique_id, node in nodes.items()}
+    child_map = {unique_id: [] for unique_id in nodes}
+    for unique_id, parents in parent_map.items():
+        for parent in parents:
+            child_map[parent].append(unique_id)
+
+    manifest = {
+        'metadata': {'dbt_version': '1.0.0', 'adapter_type': adapter_type},
+        'nodes': nodes,
+        'sources': {},
+        'macros': {},
+        'parent_map': parent_map,
+        'child_map': child_map,
+    }
+    catalog = {'metadata': {'dbt_version': '1.0.0'}, 'nodes': catalog_nodes, 'sources': {}}
+    config = {'name': PROJECT_NAME, 'version': '1.0.0', 'config-version': 2}
+    return manifest, catalog, config
+
+
+def write_project(project_dir: str, **kwargs) -> str:
+    manifest, catalog, config = generate_artifacts(**kwargs)
+    target_dir = os.path.join(project_dir, 'target')
+    os.makedirs(target_dir, exist_ok=True)
+    with open(os.path.join(target_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+    with open(os.path.join(target_dir, 'catalog.json'), 'w') as f:
+        json.dump(catalog, f)
+    with open(os.path.join(project_dir, 'dbt_project.yml'), 'w') as f:
+        json.dump(config, f)  # JSON is valid YAML
+    return target_dir
+
+
+def add_arguments(argparser: argparse.ArgumentParser):
+    argparser.add_argument('--models', default=100, type=int, help='Number of dbt models')
+    argparser.add_argument('--columns', default=20, type=int, help='Columns per model')
+    argparser.add_argument('--measures', default=1, type=int, help='Measures per column')
+    argparser.add_argument('--filters', default=0, type=int, help='Filters per measure')
+    argparser.add_argument('--non-model-share', default=0.5, type=float, help='Share of manifest nodes that are not models')
+    argparser.add_argument('--adapter', default='postgres', choices=[a.value for a in SupportedDbtAdapters])
+    argparser.add_argument('--seed', default=0, type=int)
+    argparser.add_argument('--declared-types', default=0.0, type=float, help='Share of columns declaring their data_type in the manifest')
+
+
+def generator_kwargs(args: argparse.Namespace) -> dict:
+    return {
+        'n_models': args.models,
+        'n_columns': args.columns,
+        'measures_per_column': args.measures,
+        'filters_per_measure': args.filters,
+        'non_model_share': args.non_model_share,
+        'adapter_type': args.adapter,
+        'seed': args.seed,
+        'declared_share': args.declared_types,
+    }
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('project_dir', type=str)
+    add_arguments(argparser)
+    args = argparser.parse_args()
+    target_dir = write_project(args.project_dir, **generator_kwargs(args))
+    print(f'Wrote synthetic dbt project to {args.project_dir} with artifacts in {target_dir}')
+
+
+if __name__ == '__main__':
+    main()
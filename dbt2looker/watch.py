@@ -0,0 +1,111 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from . import loader
+from . import models
+from . import parser
+
+
+class WatchUpdate(NamedTuple):
+    changed_models: List[models.DbtTypedModel]
+    removed_names: List[str]
+
+
+def node_fingerprint(raw_node: dict, raw_catalog_node: Optional[dict]) -> bytes:
+    # Dict equality ignores key order, but the order of columns and measures is the order of the generated fields
+    return hashlib.sha256(json.dumps([raw_node, raw_catalog_node]).encode('utf-8')).digest()
+
+
+class ArtifactPoller:
+    def __init__(self, paths: List[str]):
+        self.paths = paths
+        self.last_seen = self.snapshot()
+        self.pending: Optional[Dict[str, Tuple[float, int]]] = None
+
+    def snapshot(self) -> Dict[str, Tuple[float, int]]:
+        snapshot = {}
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime, stat.st_size)
+        return snapshot
+
+    def poll(self) -> bool:
+        # Only report a change once files have stopped changing between two polls, so
+        # artifacts that dbt is still writing are not read half way through
+        current = self.snapshot()
+        if current == self.last_seen:
+            self.pending = None
+            return False
+        if current != self.pending:
+            self.pending = current
+            return False
+        self.last_seen = current
+        self.pending = None
+        return True
+
+
+class WatchState:
+    def __init__(self, tag: Optional[str] = None):
+        self.tag = tag
+        self.fingerprints: Dict[str, bytes] = {}
+        self.typed_models: Dict[str, models.DbtTypedModel] = {}
+        self.metadata: Optional[dict] = None
+        self.config: Optional[dict] = None
+        self.adapter_type: Optional[models.SupportedDbtAdapters] = None
+        self.project_name: Optional[str] = None
+
+    def update(self, raw_manifest: dict, raw_catalog: dict, raw_config: dict) -> WatchUpdate:
+        metadata = raw_manifest.get('metadata', {})
+        if self.metadata is None or metadata.get('adapter_type') != self.metadata.get('adapter_type') or raw_config != self.config:
+            # The adapter or project config changed, every model has to be regenerated
+            self.fingerprints = {}
+        # Other metadata such as generated_at changes on every dbt invocation
+        self.metadata = metadata
+        self.config = raw_config
+
+        catalog_nodes = raw_catalog.get('nodes', {})
+        selected = {
+            unique_id: (raw_node, catalog_nodes.get(unique_id))
+            for unique_id, raw_node in raw_manifest.get('nodes', {}).items()
+            if raw_node.get('resource_type') == 'model'
+            and (self.tag is None or loader.raw_tags_match(self.tag, raw_node))
+        }
+        fingerprints = {unique_id: node_fingerprint(*raw) for unique_id, raw in selected.items()}
+        changed = {
+            unique_id: raw
+            for unique_id, raw in selected.items()
+            if self.fingerprints.get(unique_id) != fingerprints[unique_id]
+        }
+        logging.debug('%d of %d selected models changed', len(changed), len(selected))
+
+        # Only nodes that changed are validated and joined with their catalog entries
+        project = parser.parse_project(
+            {'metadata': self.metadata, 'nodes': {unique_id: raw_node for unique_id, (raw_node, _) in changed.items()}},
+            {'nodes': {unique_id: raw_catalog_node for unique_id, (_, raw_catalog_node) in changed.items() if raw_catalog_node is not None}},
+            self.config,
+        )
+        changed_models = parser.parse_typed_models(project, tag=self.tag)
+        self.adapter_type = parser.parse_adapter_type(project.manifest)
+        self.project_name = project.config.name
+
+        removed_models = [
+            model
+            for unique_id, model in self.typed_models.items()
+            if unique_id not in selected or unique_id in changed
+        ]
+        for model in removed_models:
+            del self.typed_models[model.unique_id]
+        for model in changed_models:
+            self.typed_models[model.unique_id] = model
+        self.fingerprints = fingerprints
+        current_names = {model.name for model in self.typed_models.values()}
+        return WatchUpdate(
+            changed_models=changed_models,
+            removed_names=sorted({model.name for model in removed_models} - current_names),
+        )
@@ -0,0 +1,281 @@
+import io
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from . import emitter
+from . import generator
+from . import models
+
+ARCHIVE_FORMATS = ('tar', 'tar.gz', 'zip')
+
+LOOKML_SUFFIXES = ('.view.lkml', '.model.lkml')
+
+
+class WriteStats(NamedTuple):
+    written: int
+    unchanged: int
+    removed: int
+    bytes_written: int
+    seconds: float
+
+
+class CheckResult(NamedTuple):
+    added: List[str]
+    changed: List[str]
+    orphaned: List[str]
+
+
+def existing_files(output_dir: str) -> Set[str]:
+    return {
+        os.path.relpath(os.path.join(root, filename), output_dir)
+        for root, _, filenames in os.walk(output_dir)
+        for filename in filenames
+    }
+
+
+def has_contents(path: str, data: bytes) -> bool:
+    # Compare sizes first so most changed files are detected without reading them
+    if os.path.getsize(path) != len(data):
+        return False
+    with open(path, 'rb') as f:
+        return f.read() == data
+
+
+def is_unchanged(path: str, data: bytes) -> bool:
+    try:
+        return has_contents(path, data)
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+
+def compare_file(path: str, data: bytes) -> Optional[str]:
+    # Returns "added" or "changed" for files that differ from data, None for identical files
+    try:
+        return None if has_contents(path, data) else 'changed'
+    except (FileNotFoundError, NotADirectoryError):
+        return 'added'
+
+
+def link_or_copy(source: str, target: str):
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def stage_file(staging_dir: str, output_dir: str, relative_path: str, data: Optional[bytes]) -> Optional[int]:
+    # Returns the number of bytes written, or None when the current file was linked unchanged
+    target = os.path.join(staging_dir, relative_path)
+    existing = os.path.join(output_dir, relative_path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if data is None or is_unchanged(existing, data):
+        link_or_copy(existing, target)
+        return None
+    with open(target, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def swap_into_place(staging_dir: str, output_dir: str):
+    if not os.path.exists(output_dir):
+        os.rename(staging_dir, output_dir)
+        return
+    backup_dir = staging_dir + '.previous'
+    try:
+        os.rename(output_dir, backup_dir)
+    except OSError:
+        # The output directory can't be moved (e.g. a mount point), replace its files one by one instead
+        logging.debug(f'Could not swap {output_dir}, replacing files individually')
+        replace_files(staging_dir, output_dir)
+        return
+    try:
+        os.rename(staging_dir, output_dir)
+    except OSError:
+        os.rename(backup_dir, output_dir)
+        raise
+    try:
+        shutil.rmtree(backup_dir)
+    except OSError as e:
+        # The new output is in place, only the previous one is left behind
+        logging.warning(f'Could not remove the previous output directory {backup_dir}: {e}')
+
+
+def replace_files(staging_dir: str, output_dir: str):
+    staged = existing_files(staging_dir)
+    for relative_path in staged:
+        target = os.path.join(output_dir, relative_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(os.path.join(staging_dir, relative_path), target)
+    for relative_path in existing_files(output_dir) - staged:
+        os.remove(os.path.join(output_dir, relative_path))
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def write_output_files(output_dir: str, files: Dict[str, str], keep: Iterable[str] = (), threads: int = 8) -> WriteStats:
+    # Stages the complete output directory next to output_dir and swaps it in, so a failed run
+    # never leaves a half updated lookml project. Lookml files that were not generated and are
+    # not in `keep` are removed, any other files in output_dir are carried over untouched.
+    start = time.perf_counter()
+    # A symlinked output directory is staged and swapped at its target, so the link keeps pointing to it
+    output_dir = os.path.realpath(output_dir)
+    os.makedirs(os.path.dirname(output_dir), exist_ok=True)
+    current_files = existing_files(output_dir) if os.path.isdir(output_dir) else set()
+    keep = set(keep)
+
+    staged: Dict[str, Optional[bytes]] = {path: contents.encode('utf-8') for path, contents in files.items()}
+    removed = 0
+    for path in current_files - set(staged):
+        if path in keep or not path.endswith(LOOKML_SUFFIXES):
+            staged[path] = None
+        else:
+            removed += 1
+
+    staging_dir = tempfile.mkdtemp(prefix=f'.{os.path.basename(output_dir)}.staging-', dir=os.path.dirname(output_dir))
+    try:
+        if os.path.isdir(output_dir):
+            shutil.copymode(output_dir, staging_dir)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(staging_dir, 0o777 & ~umask)
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            bytes_written = list(executor.map(
+                lambda item: stage_file(staging_dir, output_dir, *item),
+                staged.items(),
+            ))
+        swap_into_place(staging_dir, output_dir)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    return WriteStats(
+        written=sum(1 for n in bytes_written if n is not None),
+        unchanged=sum(1 for path, n in zip(staged, bytes_written) if n is None and path in files),
+        removed=removed,
+        bytes_written=sum(n for n in bytes_written if n is not None),
+        seconds=time.perf_counter() - start,
+    )
+
+
+def check_output_files(output_dir: str, files: Iterable[Tuple[str, str]], keep: Iterable[str] = (), threads: int = 8) -> CheckResult:
+    # Compares generated files with output_dir in a thread pool without writing anything. At most
+    # threads * 4 generated files wait for comparison, so files are compared while generation continues.
+    # Lookml files in output_dir that were not generated and are not in `keep` are orphaned.
+    current_files = existing_files(output_dir) if os.path.isdir(output_dir) else set()
+    generated = set()
+    differences: Dict[str, List[str]] = {'added': [], 'changed': []}
+
+    def collect(relative_path, future):
+        difference = future.result()
+        if difference is not None:
+            differences[difference].append(relative_path)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending = deque()
+        for relative_path, contents in files:
+            relative_path = os.path.normpath(relative_path)
+            generated.add(relative_path)
+            pending.append((relative_path, executor.submit(compare_file, os.path.join(output_dir, relative_path), contents.encode('utf-8'))))
+            if len(pending) >= threads * 4:
+                collect(*pending.popleft())
+        while pending:
+            collect(*pending.popleft())
+
+    keep = {os.path.normpath(path) for path in keep}
+    return CheckResult(
+        added=sorted(differences['added']),
+        changed=sorted(differences['changed']),
+        orphaned=sorted(
+            path
+            for path in current_files - generated - keep
+            if path.endswith(LOOKML_SUFFIXES)
+        ),
+    )
+
+
+def stream_view_files(output_dir: str, model: models.DbtTypedModel, adapter_type: models.SupportedDbtAdapters, max_fields: Optional[int] = None) -> List[str]:
+    # Writes each field of the view to its file as soon as it is generated, so a view is never
+    # held in memory as a whole. Returns the written paths relative to output_dir.
+    views_dir = os.path.join(output_dir, 'views')
+    os.makedirs(views_dir, exist_ok=True)
+    paths = []
+    for filename, lookml in generator.iter_lookml_view_parts(model, adapter_type, max_fields):
+        path = os.path.join(views_dir, filename)
+        try:
+            with open(path, 'w') as f:
+                emitter.dump(lookml, f)
+        except BaseException:
+            # Do not leave a truncated view behind when generating a field fails
+            os.remove(path)
+            raise
+        paths.append(f'views/{filename}')
+    return paths
+
+
+def remove_stale_refinements(output_dir: str, filenames: Iterable[str]) -> List[str]:
+    # A view that is split into fewer +refinement files than in an earlier run, or not split at all,
+    # leaves the refinement files of that run behind, and the refinement include would still load them
+    written = set(filenames)
+    views_dir = os.path.join(output_dir, 'views')
+    removed = []
+    try:
+        entries = list(os.scandir(views_dir))
+    except FileNotFoundError:
+        return removed
+    for entry in entries:
+        if not entry.name.endswith('.view.lkml'):
+            continue
+        view_name, _, part = entry.name[:-len('.view.lkml')].rpartition('__refinement_')
+        path = f'views/{entry.name}'
+        if view_name and part.isdigit() and f'views/{view_name}.view.lkml' in written and path not in written:
+            os.remove(entry.path)
+            removed.append(path)
+    if removed:
+        logging.debug('Removed %d stale refinement files', len(removed))
+    return removed
+
+
+def archive_format_from_path(path: str) -> str:
+    if path.endswith(('.tar.gz', '.tgz')):
+        return 'tar.gz'
+    if path.endswith('.zip'):
+        return 'zip'
+    return 'tar'
+
+
+def write_archive(fileobj: BinaryIO, files: Iterable[Tuple[str, str]], archive_format: str = 'tar') -> Tuple[int, int]:
+    # Files are added as they are produced, both formats support unseekable streams like stdout
+    count = 0
+    total_bytes = 0
+    if archive_format == 'zip':
+        with zipfile.ZipFile(fileobj, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for path, contents in files:
+                data = contents.encode('utf-8')
+                info = zipfile.ZipInfo(path, date_time=time.localtime()[:6])
+                # A ZipInfo is stored uncompressed unless it says otherwise, whatever the archive's compression
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                archive.writestr(info, data)
+                count += 1
+                total_bytes += len(data)
+        return count, total_bytes
+    mode = 'w|gz' if archive_format == 'tar.gz' else 'w|'
+    with tarfile.open(fileobj=fileobj, mode=mode) as archive:
+        for path, contents in files:
+            data = contents.encode('utf-8')
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            archive.addfile(info, io.BytesIO(data))
+            count += 1
+            total_bytes += len(data)
+    return count, total_bytes
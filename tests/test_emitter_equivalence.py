@@ -0,0 +1,133 @@
+"""The native emitter has to write the same lookml as lkml.dump for every file dbt2looker generates."""
+import copy
+import glob
+import os
+
+import lkml
+import pytest
+
+from dbt2looker import api, emitter, generator, synthetic, writer
+from dbt2looker.models import SupportedDbtAdapters
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'example')
+
+
+def assert_equivalent(native: str, reference: str):
+    assert native == reference
+    assert lkml.load(native) == lkml.load(reference)
+
+
+def add_edge_case_models(raw_manifest: dict, raw_catalog: dict):
+    # Models with empty, missing and quoted values next to the synthetic ones
+    template = raw_manifest['nodes']['model.synthetic.model_0']
+    edge_cases = {
+        'no_columns': {'columns': {}, 'description': '', 'meta': {}},
+        'quoted': {
+            'description': 'Says "hello"\nover \\"two\\" lines',
+            'columns': {
+                'column_0': {'name': 'column_0', 'description': 'A "quoted" column', 'meta': {
+                    'measures': {'total': {'type': 'sum', 'description': '', 'sql': '${TABLE}."column_0" * 2'}},
+                }},
+            },
+        },
+        'null_meta': {
+            'columns': {
+                'column_0': {'name': 'column_0', 'description': '', 'data_type': None, 'meta': {
+                    'dimension': {'enabled': True, 'name': None, 'sql': None, 'description': None, 'value_format_name': None},
+                    'measures': {'count': {'type': 'count', 'filters': None, 'description': None, 'group_label': None, 'label': None}},
+                }},
+                'column_1': {'name': 'column_1', 'description': '', 'meta': {'dimension': {'enabled': False}}},
+            },
+            'meta': {'joins': []},
+        },
+    }
+    for name, fields in edge_cases.items():
+        node = {**copy.deepcopy(template), 'name': name, 'unique_id': f'model.synthetic.{name}', **fields}
+        raw_manifest['nodes'][node['unique_id']] = node
+        raw_catalog['nodes'][node['unique_id']] = synthetic.catalog_node(node, raw_manifest['metadata']['adapter_type'])
+
+
+@pytest.fixture(scope='module', params=[adapter_type.value for adapter_type in SupportedDbtAdapters])
+def project(request) -> api.DbtProject:
+    raw_manifest, raw_catalog, raw_config = synthetic.generate_artifacts(
+        n_models=12,
+        n_columns=8,
+        measures_per_column=2,
+        filters_per_measure=2,
+        adapter_type=request.param,
+    )
+    add_edge_case_models(raw_manifest, raw_catalog)
+    return api.load_dbt_project(raw_manifest, raw_catalog, raw_config)
+
+
+@pytest.mark.parametrize('path', sorted(glob.glob(os.path.join(EXAMPLE_DIR, 'lookml', '**', '*.lkml'), recursive=True)))
+def test_example_project(path):
+    with open(path) as f:
+        parsed = lkml.load(f)
+    assert_equivalent(emitter.dump(parsed), lkml.dump(parsed))
+
+
+def test_views(project):
+    for model in project.models:
+        native = generator.lookml_view_from_dbt_model(model, project.adapter_type, emitter='native')
+        reference = generator.lookml_view_from_dbt_model(model, project.adapter_type, emitter='lkml')
+        assert native.filename == reference.filename
+        assert_equivalent(native.contents, reference.contents)
+
+
+def test_models(project):
+    for model in project.models:
+        native = generator.lookml_model_from_dbt_model(model, 'connection', emitter='native')
+        reference = generator.lookml_model_from_dbt_model(model, 'connection', emitter='lkml')
+        assert native.filename == reference.filename
+        assert_equivalent(native.contents, reference.contents)
+
+
+@pytest.mark.parametrize('model_files', ['project', 'folder', 'tag', 'package'])
+@pytest.mark.parametrize('refined', [False, True])
+def test_consolidated_models(project, model_files, refined):
+    refined_views = {model.name for model in project.models[::2]} if refined else frozenset()
+    native = generator.lookml_grouped_models_from_dbt_models(project.models, 'connection', model_files, project.name, emitter='native', refined_views=refined_views)
+    reference = generator.lookml_grouped_models_from_dbt_models(project.models, 'connection', model_files, project.name, emitter='lkml', refined_views=refined_views)
+    assert [model.filename for model in native] == [model.filename for model in reference]
+    for native_model, reference_model in zip(native, reference):
+        assert_equivalent(native_model.contents, reference_model.contents)
+
+
+@pytest.mark.parametrize('max_fields', [1, 3, 100])
+def test_refinements(project, max_fields):
+    for model in project.models:
+        native = generator.lookml_view_files_from_dbt_model(model, project.adapter_type, emitter='native', max_fields=max_fields)
+        reference = generator.lookml_view_files_from_dbt_model(model, project.adapter_type, emitter='lkml', max_fields=max_fields)
+        assert [view.filename for view in native] == [view.filename for view in reference]
+        for native_view, reference_view in zip(native, reference):
+            assert_equivalent(native_view.contents, reference_view.contents)
+
+
+@pytest.mark.parametrize('max_fields', [None, 3])
+def test_streamed_views(project, max_fields, tmp_path):
+    for model in project.models:
+        paths = writer.stream_view_files(str(tmp_path), model, project.adapter_type, max_fields=max_fields)
+        reference = generator.lookml_view_files_from_dbt_model(model, project.adapter_type, emitter='lkml', max_fields=max_fields)
+        assert paths == [f'views/{view.filename}' for view in reference]
+        for path, reference_view in zip(paths, reference):
+            with open(tmp_path / path) as f:
+                assert_equivalent(f.read(), reference_view.contents)
+
+
+@pytest.mark.parametrize('lookml', [
+    {'view': {'name': 'empty'}},
+    {'view': {'name': 'empty', 'dimensions': [], 'measures': []}},
+    {'explore': {'name': 'empty', 'description': '', 'joins': []}},
+    {'connection': 'connection', 'includes': [], 'explores': []},
+])
+def test_empty_values(lookml):
+    assert_equivalent(emitter.dump(lookml), lkml.dump(lookml))
+
+
+def test_none_values():
+    lookml = {'explore': {'name': 'explore', 'description': None}}
+    with pytest.raises(TypeError):
+        lkml.dump(lookml)
+    with pytest.raises(TypeError):
+        emitter.dump(lookml)
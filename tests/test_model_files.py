@@ -0,0 +1,14 @@
+import lkml
+
+from dbt2looker import api, generator, synthetic
+
+
+def test_consolidated_model_only_includes_generated_views():
+    raw_manifest, raw_catalog, raw_config = synthetic.generate_artifacts(n_models=12, n_columns=3)
+    project = api.load_dbt_project(raw_manifest, raw_catalog, raw_config)
+    generated = [model for model in project.models if model.meta.joins]
+    model_files = generator.lookml_grouped_models_from_dbt_models(generated, 'connection', 'project', project.name)
+    includes = lkml.load(model_files[0].contents)['includes']
+    joined = {join.join for model in generated for join in model.meta.joins}
+    assert joined - {model.name for model in generated}
+    assert set(includes) == {f'/views/{model.name}.view.lkml' for model in generated}
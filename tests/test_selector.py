@@ -0,0 +1,101 @@
+import logging
+
+import pytest
+
+from dbt2looker import selector
+
+
+def raw_node(name: str, parents=(), tags=(), path=None, resource_type='model') -> dict:
+    return {
+        'resource_type': resource_type,
+        'name': name,
+        'package_name': 'shop',
+        'fqn': ['shop', 'marts', name],
+        'original_file_path': path or f'models/marts/{name}.sql',
+        'tags': list(tags),
+        'depends_on': {'nodes': [f'model.shop.{parent}' for parent in parents]},
+    }
+
+
+@pytest.fixture
+def raw_manifest() -> dict:
+    # raw_orders -> stg_orders -> orders -> order_items -> revenue, customers -> orders
+    nodes = [
+        raw_node('raw_orders', path='models/staging/raw_orders.sql'),
+        raw_node('stg_orders', parents=['raw_orders'], tags=['staging'], path='models/staging/stg_orders.sql'),
+        raw_node('customers', tags=['finance']),
+        raw_node('orders', parents=['stg_orders', 'customers'], tags=['finance', 'daily']),
+        raw_node('order_items', parents=['orders'], tags=['daily']),
+        raw_node('revenue', parents=['order_items'], tags=['finance']),
+    ]
+    return {'nodes': {f'model.shop.{node["name"]}': node for node in nodes}}
+
+
+def names(unique_ids) -> set:
+    return {unique_id.rpartition('.')[2] for unique_id in unique_ids}
+
+
+@pytest.mark.parametrize('criterion, parts', [
+    ('2+orders', {'parents_depth': '2', 'parents': '+', 'method': None, 'value': 'orders', 'children': None, 'children_depth': None}),
+    ('orders+1', {'parents_depth': None, 'parents': None, 'method': None, 'value': 'orders', 'children': '+', 'children_depth': '1'}),
+    ('+tag:finance+', {'parents_depth': '', 'parents': '+', 'method': 'tag', 'value': 'finance', 'children': '+', 'children_depth': ''}),
+])
+def test_selector_pattern(criterion, parts):
+    assert selector.SELECTOR_PATTERN.match(criterion).groupdict() == parts
+
+
+@pytest.mark.parametrize('select, expected', [
+    (['orders'], {'orders'}),
+    (['1+orders'], {'orders', 'stg_orders', 'customers'}),
+    (['2+orders'], {'orders', 'stg_orders', 'customers', 'raw_orders'}),
+    (['+orders'], {'orders', 'stg_orders', 'customers', 'raw_orders'}),
+    (['orders+1'], {'orders', 'order_items'}),
+    (['orders+'], {'orders', 'order_items', 'revenue'}),
+    (['path:models/staging'], {'raw_orders', 'stg_orders'}),
+    (['shop.marts.orders'], {'orders'}),
+    (['tag:finance,tag:daily'], {'orders'}),
+    (['tag:finance,orders+'], {'orders', 'revenue'}),
+    (['tag:staging', 'revenue'], {'stg_orders', 'revenue'}),
+])
+def test_select(raw_manifest, select, expected):
+    assert names(selector.select_node_ids(raw_manifest, select=select)) == expected
+
+
+def test_exclude(raw_manifest):
+    selected = selector.select_node_ids(raw_manifest, select=['orders+'], exclude=['tag:finance'])
+    assert names(selected) == {'order_items'}
+    assert names(selector.select_node_ids(raw_manifest, exclude=['path:models/staging', 'customers'])) == {'orders', 'order_items', 'revenue'}
+
+
+def test_graph_from_depends_on(raw_manifest):
+    graph = selector.ManifestGraph(raw_manifest)
+    assert sorted(graph.child_map['model.shop.orders']) == ['model.shop.order_items']
+    assert sorted(graph.child_map['model.shop.stg_orders']) == ['model.shop.orders']
+    assert sorted(graph.child_map['model.shop.customers']) == ['model.shop.orders']
+    assert 'model.shop.revenue' not in graph.child_map
+
+
+def test_graph_prefers_manifest_maps(raw_manifest):
+    raw_manifest['parent_map'] = {'model.shop.revenue': ['model.shop.customers']}
+    assert names(selector.select_node_ids(raw_manifest, select=['+revenue'])) == {'revenue', 'customers'}
+    assert names(selector.select_node_ids(raw_manifest, select=['customers+'])) == {'customers', 'revenue'}
+
+
+def test_select_artifacts_keeps_selected_models(raw_manifest):
+    raw_manifest['nodes']['test.shop.orders_unique'] = raw_node('orders_unique', parents=['orders'], resource_type='test')
+    raw_catalog = {'nodes': {'model.shop.orders': {}, 'model.shop.revenue': {}}}
+    manifest, catalog = selector.select_artifacts(raw_manifest, raw_catalog, select=['orders+'])
+    assert names(manifest['nodes']) == {'orders', 'order_items', 'revenue'}
+    assert names(catalog['nodes']) == {'orders', 'revenue'}
+
+
+@pytest.mark.parametrize('select', [['@orders'], ['tag:missing'], ['orders,tag:missing']])
+def test_criterion_without_matches_warns(raw_manifest, caplog, select):
+    with caplog.at_level(logging.WARNING):
+        assert selector.select_node_ids(raw_manifest, select=select) == set()
+    assert 'does not match any nodes' in caplog.text
+
+
+def test_unsupported_method(raw_manifest):
+    with pytest.raises(selector.SelectorError, match='Unsupported selector method "config"'):
+        selector.select_node_ids(raw_manifest, select=['config:materialized'])